@@ -0,0 +1,66 @@
+import threading
+
+from download_scheduler import get_download_scheduler
+
+
+class PrefetchJob:
+    """
+    검색 직후 기사 본문을 미리 받아 디스크 본문 캐시를 채우는 백그라운드 작업
+    - fetch(url) → 이번에 받은 바이트 수 (이미 캐시에 있으면 0)
+    - byte_budget: 이 작업이 받을 최대 바이트, 넘으면 남은 기사는 건너뜀
+    - cancel(): 아직 시작하지 않은 기사는 건너뛰고, 진행 중인 다운로드만 마무리
+    - 다운로드는 DownloadScheduler를 거치므로 언론사별/전체 동시 요청 상한을 화면 요청과 함께 따른다
+      (작업 스레드 수는 max_workers로 따로 낮게 잡아 사용자가 연 기사보다 앞서지 않도록 함)
+    - registry를 넘기면 기사별 잠금을 잡고 받아, 같은 기사를 사용자가 동시에 열어도 한 번만 다운로드
+    """
+
+    def __init__(self, urls, fetch, byte_budget=20 * 1024 * 1024, max_workers=4, registry=None):
+        self.urls = list(urls)
+        self.byte_budget = byte_budget
+        self.max_workers = max_workers
+        self.fetched = 0
+        self.bytes = 0
+        self.errors = 0
+        self._fetch = fetch
+        self._registry = registry
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def _skip(self):
+        return self._cancel.is_set() or self.bytes >= self.byte_budget
+
+    def _fetch_one(self, url):
+        if self._skip():
+            return
+        try:
+            if self._registry is not None:
+                with self._registry.lock_for(url):
+                    size = self._fetch(url)
+            else:
+                size = self._fetch(url)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            return
+        with self._lock:
+            self.bytes += size
+            self.fetched += 1 if size else 0
+
+    def _run(self):
+        get_download_scheduler().map(self._fetch_one, self.urls, url_of=lambda url: url, max_workers=self.max_workers)
@@ -0,0 +1,105 @@
+import hashlib
+import threading
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 같은 기사인데 유입 경로만 다른 URL을 하나로 묶기 위해 제거하는 추적용 파라미터
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "ref", "from", "cmpid", "ncid", "sns", "share"}
+
+
+def canonical_url(url):
+    """
+    기사 URL 정규화
+    - http/https, www./m. 접두어, 기본 포트, 끝 슬래시, #fragment 차이 제거
+    - utm_* 등 추적용 파라미터 제거 후 나머지 파라미터 정렬 (기사 번호 파라미터는 유지)
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+@lru_cache(maxsize=100000)
+def article_key(url):
+    """정규화 URL 기반 기사 id (16자리 hex)"""
+    return hashlib.sha1(canonical_url(url).encode("utf-8")).hexdigest()[:16]
+
+
+class ArticleRegistry:
+    """
+    정규화 URL 단위 기사 레지스트리 (세션 상태의 "article_registry")
+    - 기사별로 검색에 걸린 기업/검색어를 모두 기록
+    - 본문/요약은 세션 밖 SummaryStore(summary_store.py)에 같은 기사 id로 보관 → 세션에는 기업/검색어만 남음
+    - 같은 기사에 대한 동시 요청은 기사별 잠금으로 직렬화 (ThreadPoolExecutor에서 호출해도 중복 실행 없음)
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, url):
+        return article_key(url) in self._entries
+
+    def _entry(self, url):
+        key = article_key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {
+                    "id": key,
+                    "link": url,
+                    "companies": set(),
+                    "queries": set(),
+                }
+            return entry
+
+    def register(self, article, company=None, query=None):
+        """검색 결과 기사 등록 → 기사 id 반환"""
+        entry = self._entry(article.get("link", ""))
+        if company:
+            entry["companies"].add(company)
+        if query or article.get("검색어"):
+            entry["queries"].add(query or article["검색어"])
+        return entry["id"]
+
+    def register_results(self, search_results):
+        """기업별 검색 결과 dict 전체 등록"""
+        for company, articles in search_results.items():
+            for article in articles:
+                self.register(article, company)
+
+    def companies(self, url):
+        return sorted(self._entries[article_key(url)]["companies"]) if url in self else []
+
+    def queries(self, url):
+        return sorted(self._entries[article_key(url)]["queries"]) if url in self else []
+
+    def lock_for(self, url):
+        key = article_key(url)
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+
+def article_registry(state):
+    """세션 상태(매핑)에 보관된 레지스트리 반환, 없으면 생성"""
+    if state is None:
+        return ArticleRegistry()
+    registry = state.get("article_registry")
+    if registry is None:
+        registry = state["article_registry"] = ArticleRegistry()
+    return registry
@@ -0,0 +1,142 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+from naver_news import parse_pub_datetime
+
+DEFAULT_STORE_PATH = os.environ.get("NEWS_STORE_PATH", "news_store.db")
+DEFAULT_KEEP_DAYS = int(os.environ.get("NEWS_STORE_KEEP_DAYS", 90))
+
+
+class ArticleStore:
+    """
+    검색어별 네이버 검색 결과(원본 item)를 SQLite에 보관하는 로컬 저장소
+    - articles: (query, link) 단위 원본 item
+    - sync_state: 검색어별 워터마크(가장 최근 pubDate)와 연속 수집이 보장된 시작일(covered_from)
+      → covered_from ~ watermark 구간은 디스크에서 읽고, 워터마크 이후 페이지만 새로 요청
+    - keep_days보다 오래된 기사는 시작할 때와 이후 prune_interval마다 삭제 (검색 기간이 그보다 길면 다시 요청)
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, max_age=300, keep_days=DEFAULT_KEEP_DAYS, prune_interval=3600):
+        self.path = path
+        self.max_age = max_age  # 마지막 동기화 후 이 시간(초) 안에는 네트워크 호출 없이 디스크만 사용
+        self.keep_days = keep_days
+        self.prune_interval = prune_interval
+        self._pruned_at = None
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    query TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    pub_ts TEXT NOT NULL,
+                    pub_date TEXT NOT NULL,
+                    item_json TEXT NOT NULL,
+                    PRIMARY KEY (query, link)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_query_date ON articles (query, pub_date)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    query TEXT PRIMARY KEY,
+                    watermark TEXT,
+                    covered_from TEXT NOT NULL,
+                    synced_at TEXT NOT NULL
+                )
+            """)
+        self.prune()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def prune(self):
+        """
+        keep_days보다 오래된 기사 삭제
+        연속 수집 구간 시작일(covered_from)도 보관 시작일 이후로 올려, 삭제된 기간을 디스크에서 읽지 않도록 함
+        """
+        self._pruned_at = datetime.now(timezone.utc)
+        if not self.keep_days:
+            return
+        cutoff = (date.today() - timedelta(days=self.keep_days)).isoformat()
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM articles WHERE pub_date < ?", (cutoff,))
+            conn.execute("UPDATE sync_state SET covered_from = ? WHERE covered_from < ?", (cutoff, cutoff))
+
+    def _maybe_prune(self):
+        if (datetime.now(timezone.utc) - self._pruned_at).total_seconds() >= self.prune_interval:
+            self.prune()
+
+    def sync_state(self, query):
+        """반환: {"watermark": datetime|None, "covered_from": date, "synced_at": datetime} 또는 None"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT watermark, covered_from, synced_at FROM sync_state WHERE query = ?", (query,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "watermark": datetime.fromisoformat(row[0]) if row[0] else None,
+            "covered_from": date.fromisoformat(row[1]),
+            "synced_at": datetime.fromisoformat(row[2]),
+        }
+
+    def is_fresh(self, state):
+        if not state or not self.max_age:
+            return False
+        return (datetime.now(timezone.utc) - state["synced_at"]).total_seconds() < self.max_age
+
+    def save(self, query, items, covered_from, complete, previous_state=None):
+        """
+        새로 받은 item을 저장하고 동기화 상태를 갱신한다.
+        - complete: 경계(워터마크 또는 start_date)까지 끊김 없이 받았는지 여부
+          끊겼다면 이번에 받은 가장 오래된 날짜 다음 날부터만 연속 구간으로 인정
+        """
+        rows = []
+        newest = previous_state["watermark"] if previous_state else None
+        oldest = None
+        for item in items:
+            pub = parse_pub_datetime(item)
+            link = item.get("originallink") or item.get("link", "")
+            rows.append((
+                query, link,
+                pub.astimezone(timezone.utc).isoformat(),
+                pub.date().isoformat(),
+                json.dumps(item, ensure_ascii=False),
+            ))
+            newest = pub if newest is None or pub > newest else newest
+            oldest = pub if oldest is None or pub < oldest else oldest
+
+        if not complete and oldest is not None:
+            covered_from = oldest.date() + timedelta(days=1)
+
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO articles (query, link, pub_ts, pub_date, item_json) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state (query, watermark, covered_from, synced_at) VALUES (?, ?, ?, ?)",
+                (
+                    query,
+                    newest.isoformat() if newest else None,
+                    covered_from.isoformat(),
+                    datetime.now(timezone.utc).isoformat(),
+                )
+            )
+        self._maybe_prune()
+
+    def load(self, query, start_date=None, end_date=None):
+        """기간 내 원본 item을 최신순으로 반환"""
+        sql = "SELECT item_json FROM articles WHERE query = ?"
+        params = [query]
+        if start_date:
+            sql += " AND pub_date >= ?"
+            params.append(start_date.isoformat())
+        if end_date:
+            sql += " AND pub_date <= ?"
+            params.append(end_date.isoformat())
+        sql += " ORDER BY pub_ts DESC"
+        with self._lock, self._connect() as conn:
+            return [json.loads(row[0]) for row in conn.execute(sql, params)]
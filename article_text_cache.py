@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from article_registry import article_key
+
+DEFAULT_TEXT_CACHE_PATH = os.environ.get("NEWS_TEXT_CACHE_PATH", "article_text.db")
+DEFAULT_TEXT_CACHE_MAX_BYTES = int(os.environ.get("NEWS_TEXT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+
+class ArticleTextCache:
+    """
+    추출한 기사 본문을 디스크(SQLite)에 압축 보관하는 캐시 (프로세스/세션 간 공유)
+    - 키: 정규화 URL 해시(article_key) → 같은 기사는 어떤 세션에서 열어도 다운로드/파싱 생략
+    - 본문은 zlib 압축, 추출 시각과 추출 방식(newspaper/paragraphs)을 함께 기록
+    - 압축 크기 합계가 max_bytes를 넘으면 마지막 조회가 오래된 기사부터 삭제 (목표: 상한의 90%)
+    """
+
+    def __init__(self, path=DEFAULT_TEXT_CACHE_PATH, max_bytes=DEFAULT_TEXT_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS article_texts (
+                    id TEXT PRIMARY KEY,
+                    link TEXT NOT NULL,
+                    strategy TEXT NOT NULL,
+                    extracted_at TEXT NOT NULL,
+                    accessed_at TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    body BLOB NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_article_texts_accessed ON article_texts (accessed_at)")
+            self._bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM article_texts").fetchone()[0]
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _now():
+        return datetime.now(timezone.utc).isoformat()
+
+    def get(self, url):
+        """반환: {"text", "strategy", "extracted_at"} 또는 None"""
+        key = article_key(url)
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT body, strategy, extracted_at FROM article_texts WHERE id = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute("UPDATE article_texts SET accessed_at = ? WHERE id = ?", (self._now(), key))
+        return {
+            "text": zlib.decompress(row[0]).decode("utf-8"),
+            "strategy": row[1],
+            "extracted_at": datetime.fromisoformat(row[2]),
+        }
+
+    def put(self, url, text, strategy):
+        key = article_key(url)
+        body = zlib.compress(text.encode("utf-8"), 6)
+        now = self._now()
+        with self._lock, self._connect() as conn:
+            old = conn.execute("SELECT size FROM article_texts WHERE id = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO article_texts (id, link, strategy, extracted_at, accessed_at, size, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, strategy, now, now, len(body), body)
+            )
+            self._bytes += len(body) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict(conn, int(self.max_bytes * 0.9))
+
+    def _evict(self, conn, target):
+        # 다른 프로세스(fetch_worker 등)가 쓴 양까지 반영해 다시 합산한 뒤, 마지막 조회가 오래된 순으로 삭제
+        self._bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM article_texts").fetchone()[0]
+        removed = []
+        for row_id, size in conn.execute("SELECT id, size FROM article_texts ORDER BY accessed_at"):
+            if self._bytes <= target:
+                break
+            removed.append((row_id,))
+            self._bytes -= size
+        conn.executemany("DELETE FROM article_texts WHERE id = ?", removed)
+
+    def size_bytes(self):
+        return self._bytes
+
+
+@lru_cache(maxsize=None)
+def get_text_cache():
+    return ArticleTextCache()
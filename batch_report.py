@@ -0,0 +1,180 @@
+"""
+Streamlit 없이 실행하는 아침 리포트 배치
+
+검색 → 필터/중복 제거 → 중요 기사 자동 선정 → 요약 → 엑셀 저장 → (선택) 텔레그램 전송
+
+예) python batch_report.py --categories 보험사 카드사 --start 2026-10-11 --end 2026-10-18 --out reports --telegram
+
+오프라인 요약(OpenAI Batch API, 응답은 최대 24시간 뒤):
+    python batch_report.py --offline-submit      # 전날 밤: 선정 기사 요약 요청을 작업 하나로 제출
+    python batch_report.py --offline-collect     # 아침: 끝난 작업 결과를 캐시에 받은 뒤 평소처럼 리포트 생성
+"""
+import argparse
+import os
+import time
+from datetime import date, datetime, timedelta
+
+from news_pipeline import (
+    favorite_categories, excel_company_categories, industry_filter_categories, ALL_COMMON_FILTER_KEYWORDS,
+    TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, Telegram,
+    new_state, expand_keywords_with_synonyms, process_keywords_with_synonyms, format_naver_usage, format_token_savings,
+    get_industry_majors_from_favorites, filter_search_results, selected_industry_keywords,
+    generate_important_article_list, to_important_preview, summarize_important_article,
+    summarize_articles_from_urls, submit_summary_batch, collect_summary_batches,
+    get_excel_download_with_favorite_and_excel_company_col, get_excel_with_joined_implications,
+    build_telegram_messages
+)
+from token_budget import get_token_budget
+
+
+def run_batch_report(categories, start_date, end_date, out_dir=".", do_summary=True, send_telegram=False,
+                     offline_submit=False, log=print):
+    """
+    전체 파이프라인을 실행하고 단계별 소요 시간과 생성한 파일 경로를 반환한다.
+    화면과 같은 기본 옵션(new_state)을 쓰며, 산업별 소분류 필터는 선택 카테고리의 전체 소분류를 적용한다.
+    offline_submit: 중요 기사 선정까지만 하고 요약 요청을 OpenAI Batch API 작업으로 제출 (결과의 "batch_id")
+    """
+    unknown = [c for c in categories if c not in favorite_categories]
+    if unknown:
+        raise ValueError(f"알 수 없는 카테고리: {', '.join(unknown)}")
+
+    majors = get_industry_majors_from_favorites(categories)
+    state = new_state(
+        cat_multi=list(categories),
+        start_date=start_date,
+        end_date=end_date,
+        industry_major_sub_map={major: industry_filter_categories.get(major, []) for major in majors},
+    )
+    timings = {}
+
+    # 1) 검색
+    t0 = time.perf_counter()
+    keywords = set()
+    for cat in categories:
+        keywords.update(favorite_categories[cat])
+    expanded = expand_keywords_with_synonyms(sorted(keywords))
+    usage = process_keywords_with_synonyms(
+        expanded,
+        start_date,
+        end_date,
+        require_keyword_in_title=state["require_exact_keyword_in_title_or_content"],
+        state=state,
+        warn=log
+    )
+    timings["search"] = time.perf_counter() - t0
+    log(format_naver_usage(usage))
+    state["article_registry"].register_results(state["search_results"])
+
+    # 2) 필터 + 중복 제거
+    t0 = time.perf_counter()
+    filtered_results = filter_search_results(state["search_results"], state)
+    timings["filter"] = time.perf_counter() - t0
+    log(f"필터 통과: {sum(len(v) for v in filtered_results.values())}건 / {len(filtered_results)}개 기업")
+
+    # 3) 중요 기사 자동 선정
+    t0 = time.perf_counter()
+    important = generate_important_article_list(
+        search_results=filtered_results,
+        common_keywords=ALL_COMMON_FILTER_KEYWORDS,
+        industry_keywords=[],
+        favorites=favorite_categories,
+        warn=log,
+        session_id=state["session_id"]
+    )
+    important = [to_important_preview(art) for art in important]
+    timings["select"] = time.perf_counter() - t0
+    log(f"중요 기사 선정: {len(important)}건")
+
+    articles_to_summarize = [
+        {"link": art["링크"], "title": art["기사제목"], "keyword": art["키워드"]} for art in important
+    ]
+    if offline_submit:
+        batch_id = submit_summary_batch(articles_to_summarize)
+        log(f"오프라인 요약 작업 제출: {batch_id}" if batch_id else "새로 요약할 기사가 없습니다.")
+        return {"batch_id": batch_id, "important_articles": important, "timings": timings, "naver_usage": usage}
+
+    # 4) 요약/감성/시사점 (같은 기업 기사는 묶음 요청으로 먼저 채운 뒤 엑셀용 행 생성)
+    t0 = time.perf_counter()
+    if do_summary:
+        summarize_articles_from_urls(articles_to_summarize, state=state)
+        log(format_token_savings(get_token_budget().snapshot()))
+    industry_keywords_all = selected_industry_keywords(state)
+    summary_data = [
+        summarize_important_article(art, industry_keywords_all, do_summary=do_summary, cache=state)
+        for art in important
+    ]
+    timings["summarize"] = time.perf_counter() - t0
+
+    # 5) 엑셀 저장 (화면의 두 다운로드 버튼과 같은 양식)
+    t0 = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    remove_dup = state["remove_duplicate_articles"]
+    files = {
+        os.path.join(out_dir, "뉴스요약_맞춤형.xlsx"): get_excel_download_with_favorite_and_excel_company_col(
+            summary_data, favorite_categories, excel_company_categories, state["search_results"],
+            remove_duplicate_articles=remove_dup
+        ),
+        os.path.join(out_dir, f"중요뉴스_최종선정_양식_{datetime.now().strftime('%Y%m%d')}.xlsx"):
+            get_excel_with_joined_implications(
+                summary_data, favorite_categories, excel_company_categories, state["search_results"],
+                remove_duplicate_articles=remove_dup
+            ),
+    }
+    for path, data in files.items():
+        with open(path, "wb") as f:
+            f.write(data.getvalue())
+        log(f"저장: {path}")
+    timings["excel"] = time.perf_counter() - t0
+
+    # 6) 텔레그램 전송 (선택)
+    if send_telegram:
+        if not (TELEGRAM_TOKEN and TELEGRAM_CHAT_ID):
+            log("TELEGRAM_TOKEN / TELEGRAM_CHAT_ID 환경변수가 없어 전송을 건너뜁니다.")
+        elif summary_data:
+            bot = Telegram()
+            for message in build_telegram_messages(summary_data):
+                bot.send_message(message)
+            log("텔레그램 전송 완료")
+
+    return {
+        "files": list(files),
+        "important_articles": summary_data,
+        "timings": timings,
+        "naver_usage": usage,
+    }
+
+
+def main(argv=None):
+    today = date.today()
+    parser = argparse.ArgumentParser(description="Credit Issue Monitoring 배치 리포트")
+    parser.add_argument("--categories", nargs="+", default=None,
+                        help="산업군(카테고리) 목록. 생략하면 전체 카테고리")
+    parser.add_argument("--start", type=date.fromisoformat, default=today - timedelta(days=7),
+                        help="시작일 (YYYY-MM-DD, 기본: 오늘-7일)")
+    parser.add_argument("--end", type=date.fromisoformat, default=today,
+                        help="종료일 (YYYY-MM-DD, 기본: 오늘)")
+    parser.add_argument("--out", default=".", help="엑셀 저장 폴더")
+    parser.add_argument("--no-summary", action="store_true", help="OpenAI 요약/감성/시사점 생략 (중요 기사 선정은 수행)")
+    parser.add_argument("--telegram", action="store_true", help="선정 결과를 텔레그램으로 전송")
+    offline = parser.add_mutually_exclusive_group()
+    offline.add_argument("--offline-submit", action="store_true",
+                         help="요약을 OpenAI Batch API 작업으로 제출만 하고 종료")
+    offline.add_argument("--offline-collect", action="store_true",
+                         help="제출한 오프라인 작업 결과를 받아 캐시에 저장한 뒤 리포트 생성")
+    args = parser.parse_args(argv)
+
+    if args.offline_collect:
+        report = collect_summary_batches()
+        print(f"오프라인 요약 수집: 완료 작업 {report['finished']}건, 저장 {report['stored']}건, 진행 중 {report['pending']}건")
+
+    categories = args.categories or [c for c, companies in favorite_categories.items() if companies]
+    result = run_batch_report(
+        categories, args.start, args.end,
+        out_dir=args.out, do_summary=not args.no_summary, send_telegram=args.telegram,
+        offline_submit=args.offline_submit
+    )
+    print("소요 시간(초): " + ", ".join(f"{k} {v:.1f}" for k, v in result["timings"].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from keyword_matcher import KeywordMatcher
+
+# 중요 기사 선정 프롬프트의 신용영향도 기준(1~5점)을 키워드 단계로 옮긴 것
+TIER_KEYWORDS = {
+    5: [
+        "신용등급", "등급전망", "등급 하향", "등급 상향", "강등", "워치리스트", "부도", "디폴트", "EOD", "기한이익상실",
+        "법정관리", "회생", "워크아웃", "유동성 위기", "자본잠식", "유상증자", "자본확충", "대규모 차입",
+        "영업정지", "과징금", "제재", "기소", "적기시정조치", "경영개선명령",
+    ],
+    4: [
+        "M&A", "인수", "합병", "지분매각", "매각", "흑자 전환", "적자 전환", "흑자전환", "적자전환", "어닝쇼크",
+        "레버리지", "차입", "회사채", "구조조정", "대주주", "지배구조", "소송",
+    ],
+    2: ["신제품", "출시", "마케팅", "프로모션", "이벤트", "제휴", "MOU", "업무협약", "사업 계획"],
+    1: ["사회공헌", "봉사", "기부", "후원", "캠페인", "ESG", "행사", "시상", "수상", "승진", "인사", "연예", "스포츠"],
+}
+# 공통 필터 대분류별 단계 (명시 목록에 있는 키워드는 그 단계를 우선)
+COMMON_CATEGORY_TIERS = {
+    "신용/등급": 4, "경영리스크": 4, "소송/규제": 4,
+    "자금/조달": 3, "실적/재무": 3, "수요/공급": 3, "거시/경제": 3,
+}
+TIER_WEIGHTS = {5: 8, 4: 4, 3: 2, 2: -2, 1: -4}
+TITLE_WEIGHT = 2  # 제목에 나온 키워드는 설명보다 두 배로 침
+
+
+class CreditImpactScorer:
+    """
+    LLM 호출 전 기사 신용영향도 사전 점수 (로컬/결정적, API 호출 없음)
+    - 키워드마다 단계(1~5)를 두고, 기사에 나온 키워드 단계별 가중치를 합산 (같은 키워드는 한 번만)
+    - 1~2점 단계(신제품/MOU/사회공헌 등) 키워드는 감점 → 명백히 사소한 기사는 후보에서 빠짐
+    - 같은 입력이면 항상 같은 순서 (동점은 최고 단계, 원래 순서로 정렬)
+    """
+
+    def __init__(self, keyword_tiers):
+        """keyword_tiers: {키워드: 단계(1~5)}"""
+        by_tier = {}
+        for keyword, tier in keyword_tiers.items():
+            by_tier.setdefault(tier, []).append(keyword)
+        self._matcher = KeywordMatcher(by_tier)
+
+    @classmethod
+    def from_vocabularies(cls, common_categories, industry_keywords=()):
+        """공통 필터 {대분류: 키워드} + 산업 키워드(3점 단계)로 구성"""
+        tiers = {}
+        for major, keywords in common_categories.items():
+            for keyword in keywords:
+                tiers[keyword] = max(tiers.get(keyword, 0), COMMON_CATEGORY_TIERS.get(major, 3))
+        for keyword in industry_keywords:
+            tiers.setdefault(keyword, 3)
+        for tier, keywords in TIER_KEYWORDS.items():
+            for keyword in keywords:
+                tiers[keyword] = tier
+        return cls(tiers)
+
+    def score(self, title, description=""):
+        """(점수, 최고 단계) — 키워드가 하나도 없으면 (0, 0)"""
+        weights = {}
+        for text, weight in ((description or "", 1), (title or "", TITLE_WEIGHT)):
+            for keyword, tier in self._matcher.iter_hits(text):
+                weights[keyword, tier] = weight
+        score = sum(TIER_WEIGHTS[tier] * weight for (_, tier), weight in weights.items())
+        return score, max((tier for _, tier in weights), default=0)
+
+    def top_k(self, articles, k, min_score=1, fallback_min_score=0):
+        """
+        점수 min_score 이상인 기사 중 상위 k건 (점수 → 최고 단계 → 원래 순서)
+        통과한 기사가 하나도 없으면 fallback_min_score 이상(기본: 어휘에 안 걸린 0점 포함) 기사 중 상위 k건
+        → 사전 점수로 판단할 근거가 없는 기업도 LLM 평가는 받음.
+        1~2점 단계 키워드만 걸린 감점 기사(점수 < 0)만 있는 기업은 빈 목록 (LLM 호출 없음)
+        """
+        scored = []
+        for i, article in enumerate(articles):
+            score, tier = self.score(article.get("title", ""), article.get("description", ""))
+            scored.append((-score, -tier, i))
+        scored.sort()
+        ranked = [entry for entry in scored if -entry[0] >= min_score]
+        if not ranked:
+            ranked = [entry for entry in scored if -entry[0] >= fallback_min_score]
+        return [articles[i] for _, _, i in ranked[:k]]
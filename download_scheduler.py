@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import zip_longest
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def host_key(url):
+    """도메인별 상한을 적용할 호스트 (www./m. 접두어 제거, ALLOWED_SOURCES와 같은 기준)"""
+    host = (urlsplit(url or "").hostname or "").lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host
+
+
+class DownloadScheduler:
+    """
+    기사 페이지 다운로드 스케줄러 (프로세스 단위로 공유)
+    - 호스트마다 keep-alive 세션(연결 풀)을 하나씩 두고 재사용
+    - 같은 언론사에는 동시에 max_per_host개까지만 요청 (과도한 동시 접속으로 차단되지 않도록)
+    - 전체 동시 다운로드는 max_total개로 제한 (기업/세션이 여럿이어도 합계 기준)
+    호스트 상한을 먼저 얻고 나서 전체 상한을 얻으므로, 한 언론사 대기 때문에 전체 슬롯이 묶이지 않는다.
+    """
+
+    def __init__(self, max_total=16, max_per_host=2, headers=None):
+        self.max_total = max_total
+        self.max_per_host = max_per_host
+        self.headers = headers or {"User-Agent": "Mozilla/5.0"}
+        self._global = threading.BoundedSemaphore(max_total)
+        self._hosts = {}  # host → (requests.Session, BoundedSemaphore)
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_per_host)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                entry = self._hosts[host] = (session, threading.BoundedSemaphore(self.max_per_host))
+            return entry
+
+    def fetch(self, url, max_bytes=2 * 1024 * 1024, chunk_size=16 * 1024, timeout=12):
+        """
+        응답 본문을 스트리밍으로 받아 (바이트, Content-Type 헤더) 반환 (슬롯은 본문을 다 받을 때까지 유지)
+        - max_bytes를 넘으면 그 지점에서 중단 (광고/스크립트로 수 MB인 페이지도 작업당 메모리 상한 유지)
+        """
+        session, host_slots = self._host(host_key(url))
+        with host_slots, self._global:
+            with session.get(url, stream=True, timeout=timeout) as r:
+                r.raise_for_status()
+                body = bytearray()
+                for chunk in r.iter_content(chunk_size=chunk_size):
+                    body += chunk
+                    if len(body) >= max_bytes:
+                        break
+                return bytes(body[:max_bytes]), r.headers.get("Content-Type", "")
+
+    def map(self, fn, items, url_of, max_workers=None):
+        """
+        items 각각에 fn을 실행하고 입력 순서대로 결과 반환.
+        호스트별로 번갈아 가며 제출해 한 언론사 기사들이 작업 스레드를 몰아서 차지하지 않도록 한다.
+        """
+        items = list(items)
+        by_host = OrderedDict()
+        for i, item in enumerate(items):
+            by_host.setdefault(host_key(url_of(item)), []).append(i)
+        order = [i for group in zip_longest(*by_host.values()) for i in group if i is not None]
+
+        results = [None] * len(items)
+        if not items:
+            return results
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_total) as executor:
+            futures = [(i, executor.submit(fn, items[i])) for i in order]
+            for i, future in futures:
+                results[i] = future.result()
+        return results
+
+
+@lru_cache(maxsize=None)
+def get_download_scheduler():
+    return DownloadScheduler()
@@ -0,0 +1,210 @@
+"""
+뉴스 검색 전용 워커 프로세스
+
+Streamlit 화면은 검색 작업을 로컬 SQLite 큐(news_jobs.db)에 넣고 완료 여부만 폴링한다.
+워커가 네이버 검색/필터를 실행하고 결과를 같은 DB에 기록하므로, 오래 걸리는 검색이
+Streamlit 스크립트 실행(다른 사용자 세션 포함)을 붙잡지 않는다.
+
+실행: python fetch_worker.py   (Streamlit과 같은 인스턴스/작업 폴더에서 함께 실행)
+워커 하트비트가 없으면 화면은 기존처럼 검색을 직접 실행한다.
+"""
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+DEFAULT_JOBS_PATH = os.environ.get("NEWS_JOBS_PATH", "news_jobs.db")
+
+
+class FetchJobQueue:
+    """
+    검색 작업 큐 + 결과 저장소 (SQLite, 프로세스 간 공유)
+    - jobs: 작업 상태 queued → running → done/failed, 결과는 JSON으로 보관
+    - workers: 워커별 마지막 하트비트 (화면에서 워커 실행 여부 판단, 죽은 워커의 작업 재할당)
+    같은 조건(job_key)의 작업이 이미 대기/실행 중이면 새로 넣지 않고 그 작업을 공유한다.
+    """
+
+    def __init__(self, path=DEFAULT_JOBS_PATH, heartbeat_timeout=15, keep_finished=86400):
+        self.path = path
+        self.heartbeat_timeout = heartbeat_timeout  # 이 시간(초) 동안 하트비트가 없으면 워커 중단으로 간주
+        self.keep_finished = keep_finished          # 완료된 작업 보관 기간(초)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    job_key TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    worker_id TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS workers (
+                    worker_id TEXT PRIMARY KEY,
+                    heartbeat_at TEXT NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _now():
+        return datetime.now(timezone.utc)
+
+    @staticmethod
+    def job_key(payload):
+        return hashlib.sha1(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def submit(self, payload):
+        """작업 등록 후 작업 id 반환 (같은 조건의 작업이 대기/실행 중이면 그 id)"""
+        key = self.job_key(payload)
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE job_key = ? AND status IN ('queued', 'running') ORDER BY created_at LIMIT 1",
+                (key,)
+            ).fetchone()
+            if row:
+                return row[0]
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, job_key, payload, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, key, json.dumps(payload, ensure_ascii=False), self._now().isoformat())
+            )
+        return job_id
+
+    def claim(self, worker_id):
+        """가장 오래된 대기 작업 1건을 running으로 바꾸고 (id, payload) 반환, 없으면 None"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")  # 여러 워커가 같은 작업을 가져가지 않도록 쓰기 잠금
+                row = conn.execute(
+                    "SELECT id, payload FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', worker_id = ?, started_at = ? WHERE id = ?",
+                        (worker_id, self._now().isoformat(), row[0])
+                    )
+                conn.commit()
+            finally:
+                conn.close()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def complete(self, job_id, result):
+        self._finish(job_id, "done", result=json.dumps(result, ensure_ascii=False))
+
+    def fail(self, job_id, error):
+        self._finish(job_id, "failed", error=str(error))
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, result, error, self._now().isoformat(), job_id)
+            )
+
+    def get(self, job_id):
+        """반환: {"status", "result", "error"} 또는 None"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT status, result, error FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if not row:
+            return None
+        return {"status": row[0], "result": json.loads(row[1]) if row[1] else None, "error": row[2]}
+
+    def heartbeat(self, worker_id):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO workers (worker_id, heartbeat_at) VALUES (?, ?)",
+                (worker_id, self._now().isoformat())
+            )
+
+    def remove_worker(self, worker_id):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+
+    def worker_alive(self):
+        cutoff = (self._now() - timedelta(seconds=self.heartbeat_timeout)).isoformat()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM workers WHERE heartbeat_at >= ? LIMIT 1", (cutoff,)).fetchone()
+        return row is not None
+
+    def recover(self):
+        """하트비트가 끊긴 워커가 잡고 있던 작업을 대기열로 되돌리고, 오래된 완료 작업을 정리"""
+        now = self._now()
+        stale = (now - timedelta(seconds=self.heartbeat_timeout)).isoformat()
+        expired = (now - timedelta(seconds=self.keep_finished)).isoformat()
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                UPDATE jobs SET status = 'queued', worker_id = NULL, started_at = NULL
+                WHERE status = 'running' AND worker_id NOT IN (
+                    SELECT worker_id FROM workers WHERE heartbeat_at >= ?
+                )
+            """, (stale,))
+            conn.execute("DELETE FROM workers WHERE heartbeat_at < ?", (stale,))
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (expired,)
+            )
+
+
+@lru_cache(maxsize=None)
+def get_fetch_queue():
+    return FetchJobQueue()
+
+
+def run_worker(queue=None, poll_interval=0.5, heartbeat_interval=5):
+    """큐에서 작업을 하나씩 꺼내 실행 (Ctrl+C로 종료)"""
+    from news_pipeline import run_search_job
+
+    queue = queue or get_fetch_queue()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    stop = threading.Event()
+
+    # 검색이 오래 걸려도 하트비트가 끊기지 않도록 별도 스레드에서 갱신 (다른 워커가 죽은 경우 작업 회수도 함께)
+    def beat():
+        while not stop.wait(heartbeat_interval):
+            queue.heartbeat(worker_id)
+            queue.recover()
+
+    queue.heartbeat(worker_id)
+    queue.recover()
+    threading.Thread(target=beat, daemon=True).start()
+    print(f"fetch worker 시작: {worker_id} ({queue.path})")
+
+    try:
+        while True:
+            claimed = queue.claim(worker_id)
+            if not claimed:
+                time.sleep(poll_interval)
+                continue
+            job_id, payload = claimed
+            started = time.perf_counter()
+            try:
+                queue.complete(job_id, run_search_job(payload))
+                print(f"[done] {job_id} {time.perf_counter() - started:.1f}s")
+            except Exception as e:
+                queue.fail(job_id, f"{type(e).__name__}: {e}")
+                print(f"[failed] {job_id} {type(e).__name__}: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        queue.remove_worker(worker_id)
+
+
+if __name__ == "__main__":
+    run_worker()
@@ -0,0 +1,158 @@
+import hashlib
+import itertools
+import os
+import re
+import threading
+from collections import OrderedDict, deque
+from functools import lru_cache
+
+VERDICT_MEMO_SIZE = int(os.environ.get("KEYWORD_VERDICT_MEMO_SIZE", 20000))
+
+
+class _VerdictMemo:
+    """
+    contains_any 결과 LRU — 모든 매처가 한 개를 공유 (매처 수와 무관하게 전체 항목 수 상한)
+    - 키: (매처 번호, 텍스트 해시) → 기사 전문을 키로 들고 있지 않음
+    - 스케줄러 작업 스레드에서도 호출되므로 잠금으로 보호
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+_VERDICT_MEMO = _VerdictMemo(VERDICT_MEMO_SIZE)
+_MATCHER_IDS = itertools.count()
+
+
+class KeywordMatcher:
+    """
+    여러 키워드를 한 번에 찾는 Aho–Corasick 자동자
+    - 키워드 목록을 한 번만 컴파일하고, 텍스트는 한 번만 훑어 모든 히트(겹치는 키워드 포함)를 찾는다
+    - 키워드마다 카테고리(예: "exclude", "common:신용/등급", "industry:은행")를 붙여 히트를 구분
+    - 기존 `kw in text` 검사와 같은 대소문자 구분 부분 문자열 일치
+    """
+
+    def __init__(self, keywords_by_category):
+        """
+        keywords_by_category: {카테고리: 키워드 목록}
+        contains_any 결과는 공유 LRU(_VERDICT_MEMO)에 기억 (rerun마다 같은 기사를 다시 훑지 않음)
+        """
+        self._memo_id = next(_MATCHER_IDS)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self.keywords = set()
+        for category, keywords in keywords_by_category.items():
+            for keyword in keywords:
+                if keyword:
+                    self._add(keyword, category)
+        self._build()
+
+    def _add(self, keyword, category):
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        if (keyword, category) not in self._out[state]:
+            self._out[state].append((keyword, category))
+        self.keywords.add(keyword)
+
+    def _build(self):
+        # BFS로 실패 링크 계산, 실패 링크 쪽 출력은 미리 합쳐 둔다
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + [o for o in self._out[self._fail[nxt]] if o not in self._out[nxt]]
+        self._out = [tuple(o) for o in self._out]
+        self._alphabet = frozenset(ch for keyword in self.keywords for ch in keyword)
+        # 히트 여부만 필요할 때는 C 수준 정규식 스캔이 더 빠르다 (긴 키워드 우선 대안 목록, 한 번만 컴파일)
+        self._any_re = re.compile(
+            "|".join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+        ) if self.keywords else None
+
+    def _matched_states(self, text, stop_at_first=False):
+        """히트가 난 상태 번호를 처음 등장한 순서대로 반환 (중복 없음)"""
+        goto, fail, out, alphabet = self._goto, self._fail, self._out, self._alphabet
+        state = 0
+        seen = set()
+        matched = []
+        for ch in text or "":
+            if ch not in alphabet:
+                # 어떤 키워드에도 없는 문자면 루트로 바로 복귀
+                state = 0
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state] and state not in seen:
+                seen.add(state)
+                matched.append(state)
+                if stop_at_first:
+                    break
+        return matched
+
+    def iter_hits(self, text):
+        """(키워드, 카테고리)를 텍스트에 처음 등장한 순서대로 반환"""
+        for state in self._matched_states(text):
+            yield from self._out[state]
+
+    def hits(self, text):
+        """{카테고리: [키워드, ...]} (카테고리별 처음 등장 순서, 중복 없음)"""
+        result = {}
+        for keyword, category in self.iter_hits(text):
+            found = result.setdefault(category, [])
+            if keyword not in found:
+                found.append(keyword)
+        return result
+
+    def found_keywords(self, text):
+        """텍스트에 포함된 키워드 집합"""
+        return {keyword for keyword, _ in self.iter_hits(text)}
+
+    def contains_any(self, text, categories=None):
+        """카테고리(생략 시 전체) 키워드가 하나라도 있으면 True"""
+        if categories is None:
+            if not text:
+                return False
+            key = (self._memo_id, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+            found = _VERDICT_MEMO.get(key)
+            if found is None:
+                found = bool(self._any_re and self._any_re.search(text))
+                _VERDICT_MEMO.put(key, found)
+            return found
+        return any(category in categories for _, category in self.iter_hits(text))
+
+
+@lru_cache(maxsize=256)
+def compile_keywords(keywords):
+    """키워드 튜플 → KeywordMatcher (같은 목록은 한 번만 컴파일)"""
+    return KeywordMatcher({None: keywords})
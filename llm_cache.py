@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+DEFAULT_LLM_CACHE_PATH = os.environ.get("NEWS_LLM_CACHE_PATH", "llm_cache.db")
+
+
+def text_hash(text):
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class LLMResultCache:
+    """
+    OpenAI 요약 결과 캐시 (SQLite, 프로세스/세션/배치 실행 간 공유)
+    - 키: (기사 본문 해시, 프롬프트 버전, 모델명, 대상 기업) → 본문이나 프롬프트/모델이 바뀌면 자동으로 새로 요청
+    - 값: 파싱이 끝난 결과 필드(JSON). 본문은 호출 측이 이미 갖고 있으므로 저장하지 않음
+    - keep_days가 지난 항목은 시작할 때 정리
+    - batch_jobs: 오프라인(OpenAI Batch API) 요약 작업 id와 요청별 (본문 해시, 대상 기업) 매핑
+      → 결과를 나중에 받아 같은 키로 저장하면 온라인 요약과 똑같이 캐시에서 재사용
+    """
+
+    def __init__(self, path=DEFAULT_LLM_CACHE_PATH, keep_days=90):
+        self.path = path
+        self.keep_days = keep_days
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_results (
+                    cache_key TEXT PRIMARY KEY,
+                    text_hash TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    target_keyword TEXT NOT NULL,
+                    result_json TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS batch_jobs (
+                    batch_id TEXT PRIMARY KEY,
+                    prompt_version TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    requests_json TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    finished_at TEXT
+                )
+            """)
+            if keep_days:
+                expired = (datetime.now(timezone.utc) - timedelta(days=keep_days)).isoformat()
+                conn.execute("DELETE FROM llm_results WHERE created_at < ?", (expired,))
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def cache_key(hashed_text, prompt_version, model, target_keyword=None):
+        parts = [hashed_text, prompt_version, model, target_keyword or ""]
+        return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, text, prompt_versions, model, target_keyword=None):
+        """
+        저장된 결과 필드 리스트 또는 None
+        prompt_versions: 버전 하나 또는 여러 개(튜플) — 같은 결과 형식을 내는 프롬프트(단건/묶음)끼리 결과를 공유
+        """
+        if isinstance(prompt_versions, str):
+            prompt_versions = (prompt_versions,)
+        hashed = text_hash(text)
+        keys = [self.cache_key(hashed, version, model, target_keyword) for version in prompt_versions]
+        with self._lock, self._connect() as conn:
+            for key in keys:
+                row = conn.execute("SELECT result_json FROM llm_results WHERE cache_key = ?", (key,)).fetchone()
+                if row:
+                    return json.loads(row[0])
+        return None
+
+    def put(self, text, prompt_version, model, target_keyword, fields):
+        self.put_hashed(text_hash(text), prompt_version, model, target_keyword, fields)
+
+    def put_hashed(self, hashed_text, prompt_version, model, target_keyword, fields):
+        """본문 대신 본문 해시로 저장 (오프라인 작업 결과처럼 본문을 다시 갖고 있지 않은 경우)"""
+        key = self.cache_key(hashed_text, prompt_version, model, target_keyword)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_results "
+                "(cache_key, text_hash, prompt_version, model, target_keyword, result_json, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, hashed_text, prompt_version, model, target_keyword or "",
+                    json.dumps(list(fields), ensure_ascii=False), datetime.now(timezone.utc).isoformat(),
+                )
+            )
+
+    def add_batch_job(self, batch_id, prompt_version, model, requests):
+        """requests: {custom_id: {"text_hash", "target_keyword"}}"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO batch_jobs "
+                "(batch_id, prompt_version, model, requests_json, status, created_at) VALUES (?, ?, ?, ?, 'submitted', ?)",
+                (batch_id, prompt_version, model, json.dumps(requests, ensure_ascii=False),
+                 datetime.now(timezone.utc).isoformat())
+            )
+
+    def pending_batch_jobs(self):
+        """아직 결과를 받지 않은 작업: [{"batch_id", "prompt_version", "model", "requests"}]"""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT batch_id, prompt_version, model, requests_json FROM batch_jobs "
+                "WHERE status = 'submitted' ORDER BY created_at"
+            ).fetchall()
+        return [
+            {"batch_id": row[0], "prompt_version": row[1], "model": row[2], "requests": json.loads(row[3])}
+            for row in rows
+        ]
+
+    def finish_batch_job(self, batch_id, status):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE batch_jobs SET status = ?, finished_at = ? WHERE batch_id = ?",
+                (status, datetime.now(timezone.utc).isoformat(), batch_id)
+            )
+
+
+@lru_cache(maxsize=None)
+def get_llm_cache():
+    return LLMResultCache()
@@ -0,0 +1,510 @@
+import asyncio
+import concurrent.futures
+import html
+import math
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+import aiohttp
+
+from keyword_matcher import compile_keywords
+
+NAVER_NEWS_URL = "https://openapi.naver.com/v1/search/news.json"
+PAGE_SIZE = 100   # display 최대값
+MAX_START = 1000  # start 최대값 (네이버 검색 API 제한)
+MAX_PAGES = (MAX_START - 1) // PAGE_SIZE + 1
+KST = timezone(timedelta(hours=9))  # 네이버 일일 쿼터 리셋 기준
+DEFAULT_QUOTA_PATH = os.environ.get("NAVER_QUOTA_PATH", "naver_quota.db")
+DEFAULT_CACHE_TTL = int(os.environ.get("NAVER_CACHE_TTL", "300"))
+DEFAULT_CACHE_SIZE = int(os.environ.get("NAVER_CACHE_SIZE", "1000"))
+
+
+class NaverAPIError(Exception):
+    """재시도 후에도 200 응답을 받지 못한 네이버 API 호출"""
+
+
+class NaverQuotaExceeded(NaverAPIError):
+    """일일 호출 쿼터 소진"""
+
+
+def exclude_by_title_keywords(title, exclude_keywords):
+    return compile_keywords(tuple(exclude_keywords)).contains_any(title)
+
+def filter_by_issues(title, desc, selected_keywords, require_keyword_in_title=False):
+    if require_keyword_in_title and selected_keywords:
+        if not any(kw.lower() in title.lower() for kw in selected_keywords):
+            return False
+    return True
+
+def infer_source_from_url(url):
+    domain = urlparse(url).netloc
+    if domain.startswith("www."):
+        domain = domain[4:]
+    return domain
+
+def normalize_query(query):
+    """single-flight 키용 검색어 정규화 (공백 정리 + 대소문자 무시)"""
+    return " ".join(query.split()).casefold()
+
+def parse_pub_datetime(item):
+    return datetime.strptime(item["pubDate"], "%a, %d %b %Y %H:%M:%S %z")
+
+def parse_naver_item(item):
+    """네이버 검색 API item → (기사 dict, 발행일 date)"""
+    title = html.unescape(re.sub("<.*?>", "", item["title"]))
+    desc  = html.unescape(re.sub("<.*?>", "", item["description"]))
+    pub_date = parse_pub_datetime(item).date()
+
+    source = item.get("source") or infer_source_from_url(item.get("originallink", "")) or "Naver"
+    source_domain = source.lower()
+    if source_domain.startswith("www."):
+        source_domain = source_domain[4:]
+
+    real_link = item.get("originallink") or item["link"]
+
+    article = {
+        "title": title,
+        "description": desc,  # 혹시 엑셀에 설명도 쓸 경우 대비
+        "link": real_link,
+        "date": pub_date.strftime("%Y-%m-%d"),
+        "source": source_domain
+    }
+    return article, pub_date
+
+
+class PaginationPlanner:
+    """
+    sort=date 검색 결과의 페이지 깊이 계획
+    - 페이지의 마지막(가장 오래된) 기사가 start_date 이전이면 그 뒤 페이지는 요청하지 않음
+    - 검색어별 일평균 기사량을 지수이동평균으로 학습해 기간에 필요한 페이지 수를 예측
+    """
+
+    def __init__(self, alpha=0.3, safety=1.2):
+        self.alpha = alpha    # 새 관측치 반영 비율
+        self.safety = safety  # 예측 페이지 여유 배수
+        self._daily_volume = {}
+        self._lock = threading.Lock()
+
+    def daily_volume(self, query):
+        with self._lock:
+            return self._daily_volume.get(query)
+
+    @staticmethod
+    def estimate_daily_volume(items):
+        """발행일 내림차순 item 리스트에서 일평균 기사 수 추정 (추정 불가 시 None)"""
+        if len(items) < 2:
+            return None
+        newest = parse_pub_datetime(items[0])
+        oldest = parse_pub_datetime(items[-1])
+        span_days = max((newest - oldest).total_seconds() / 86400, 1 / 24)
+        return len(items) / span_days
+
+    def observe(self, query, items):
+        volume = self.estimate_daily_volume(items)
+        if volume is None:
+            return
+        with self._lock:
+            prev = self._daily_volume.get(query)
+            self._daily_volume[query] = volume if prev is None else prev + self.alpha * (volume - prev)
+
+    def predict_pages(self, query, start_date, first_page_items=None, today=None):
+        """
+        오늘부터 start_date까지 덮는 데 필요한 총 페이지 수 예측 (1~MAX_PAGES)
+        학습된 값이 없으면 1페이지 응답으로 추정한다.
+        """
+        if start_date is None:
+            return MAX_PAGES
+        volume = self.daily_volume(query)
+        if volume is None and first_page_items:
+            volume = self.estimate_daily_volume(first_page_items)
+        if volume is None:
+            return 1
+        days = ((today or date.today()) - start_date).days + 1
+        pages = math.ceil(volume * max(days, 1) * self.safety / PAGE_SIZE)
+        return max(1, min(pages, MAX_PAGES))
+
+    @staticmethod
+    def passed_window(items, boundary):
+        """
+        발행일 내림차순 페이지가 이미 경계까지 내려갔는지 여부
+        - boundary가 date(기간 시작일)면 그 이전 날짜, datetime(저장소 워터마크)이면 이미 본 시각에 도달했을 때
+        """
+        if not items or boundary is None:
+            return False
+        oldest = parse_pub_datetime(items[-1])
+        if isinstance(boundary, datetime):
+            return oldest <= boundary
+        return oldest.date() < boundary
+
+
+class NaverRateLimiter:
+    """
+    네이버 API 호출 중앙 제어 (프로세스 내 모든 검색/세션이 공유)
+    - 초당 token bucket으로 호출 간격 평탄화
+    - 일일 호출 쿼터 카운터(KST 날짜 기준)를 SQLite에 누적 저장
+    """
+
+    def __init__(self, rate=10, burst=10, daily_quota=25000, quota_path=DEFAULT_QUOTA_PATH):
+        self.rate = rate
+        self.burst = burst
+        self.daily_quota = daily_quota
+        self.quota_path = quota_path
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._day = None
+        self._used_today = 0   # 저장소 기준 오늘 누적 호출 수
+        self._pending = 0      # 아직 저장소에 반영하지 않은 호출 수
+        with sqlite3.connect(self.quota_path, timeout=30) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS naver_quota (day TEXT PRIMARY KEY, calls INTEGER NOT NULL)")
+
+    def _roll_day(self):
+        today = datetime.now(KST).date().isoformat()
+        if self._day != today:
+            self.flush()
+            with sqlite3.connect(self.quota_path, timeout=30) as conn:
+                row = conn.execute("SELECT calls FROM naver_quota WHERE day = ?", (today,)).fetchone()
+            self._day = today
+            self._used_today = row[0] if row else 0
+            self._pending = 0
+
+    def used_today(self):
+        with self._lock:
+            self._roll_day()
+            return self._used_today + self._pending
+
+    def remaining_today(self):
+        return max(self.daily_quota - self.used_today(), 0)
+
+    async def acquire(self):
+        """토큰 1개를 얻을 때까지 대기한 뒤 호출 1회를 쿼터에 기록"""
+        while True:
+            with self._lock:
+                self._roll_day()
+                if self._used_today + self._pending >= self.daily_quota:
+                    raise NaverQuotaExceeded(f"네이버 API 일일 쿼터({self.daily_quota:,}회) 소진")
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._pending += 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+
+    def flush(self):
+        """메모리에 모인 호출 수를 저장소에 더하고, 다른 프로세스 사용분까지 반영해 다시 읽음"""
+        if not self._day or not self._pending:
+            return
+        with sqlite3.connect(self.quota_path, timeout=30) as conn:
+            conn.execute(
+                "INSERT INTO naver_quota (day, calls) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET calls = calls + excluded.calls",
+                (self._day, self._pending)
+            )
+            row = conn.execute("SELECT calls FROM naver_quota WHERE day = ?", (self._day,)).fetchone()
+        self._used_today = row[0] if row else self._pending
+        self._pending = 0
+
+    def sync(self):
+        with self._lock:
+            self.flush()
+
+
+class SingleFlight:
+    """
+    동일 키 요청의 in-flight 공유
+    - 먼저 들어온 호출(leader)만 실제로 실행하고, 같은 키로 동시에 들어온 호출은 그 결과를 기다림
+    - Streamlit 세션마다 다른 스레드/이벤트 루프에서 돌기 때문에 concurrent.futures.Future로 공유
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    async def do(self, key, factory):
+        """반환: (결과, 다른 호출의 결과를 공유받았는지 여부)"""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+        if not leader:
+            return await asyncio.wrap_future(future), True
+
+        try:
+            result = await factory()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+class ResponseCache:
+    """
+    네이버 검색 페이지 원본 JSON 캐시 (메모리, TTL + 크기 제한 LRU)
+    키: (검색어, start, display, sort)
+    """
+
+    def __init__(self, ttl=DEFAULT_CACHE_TTL, max_entries=DEFAULT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (저장 시각, data)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]  # 만료
+            self.misses += 1
+            return None
+
+    def put(self, key, data):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+            }
+
+
+class NaverNewsEngine:
+    """
+    네이버 뉴스 검색 비동기 엔진
+    - 한 번의 검색 실행에서 모든 요청이 하나의 keep-alive 커넥션 풀(aiohttp.ClientSession)을 공유
+    - 전역 세마포어로 동시 요청 수 제한 (기업/검색어/페이지 구분 없이 합산)
+    - 1페이지 응답 이후 필요한 페이지는 planner 예측치만큼 묶어서(wave) 동시에 요청하고,
+      기간을 벗어난 페이지가 나오면 즉시 중단
+    - store(ArticleStore)가 있으면 이미 수집한 구간은 디스크에서 읽고 워터마크 이후 페이지만 요청
+    - 모든 호출은 limiter(NaverRateLimiter)를 거치며 429/5xx/네트워크 오류는 지터 포함 지수 백오프로 재시도
+    - (정규화 검색어, 기간, 페이지)가 같은 요청은 기업/동의어/사용자와 무관하게 single-flight로 1회만 호출
+    - 최근에 받은 페이지는 response_cache(ResponseCache)에서 바로 반환 (네트워크 호출 없음)
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, client_id, client_secret, max_concurrency=10, timeout=10, planner=None, store=None,
+                 limiter=None, max_retries=4, backoff_base=0.5, backoff_max=8.0, single_flight=None,
+                 response_cache=None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.planner = planner or PaginationPlanner()
+        self.store = store
+        self.limiter = limiter or NaverRateLimiter()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.single_flight = single_flight or SingleFlight()
+        self.response_cache = response_cache or ResponseCache()
+
+    def search(self, queries, start_date=None, end_date=None, limit=1000, exclude_keywords=()):
+        """
+        동기 진입점. 모든 검색어를 동시에 조회한다.
+        반환: ({검색어: 기사 리스트}, {검색어: 예외}, 사용량 dict)
+        - 날짜 범위/제외 키워드는 여기서 적용, 제목 키워드 조건(filter_by_issues)은 호출 측에서 적용
+        - 사용량: calls(실제 호출), retries, throttled(429 횟수), shared(다른 요청과 공유한 페이지 수),
+          cache_hits / cache_misses(이번 검색의 응답 캐시 적중), truncated(중간 페이지 실패로 잘린 검색어),
+          used_today / daily_quota, cache(프로세스 누적 캐시 통계)
+        """
+        queries = list(dict.fromkeys(q for q in queries if q))
+        usage = {"calls": 0, "retries": 0, "throttled": 0, "shared": 0,
+                 "cache_hits": 0, "cache_misses": 0, "truncated": []}
+        if queries:
+            results, errors = asyncio.run(
+                self._search_all(queries, start_date, end_date, limit, exclude_keywords, usage)
+            )
+        else:
+            results, errors = {}, {}
+        self.limiter.sync()
+        usage["used_today"] = self.limiter.used_today()
+        usage["daily_quota"] = self.limiter.daily_quota
+        usage["cache"] = self.response_cache.stats()
+        return results, errors, usage
+
+    async def _search_all(self, queries, start_date, end_date, limit, exclude_keywords, usage):
+        headers = {
+            "X-Naver-Client-Id": self.client_id or "",
+            "X-Naver-Client-Secret": self.client_secret or ""
+        }
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with aiohttp.ClientSession(headers=headers, connector=connector, timeout=timeout) as session:
+            run = {"session": session, "semaphore": semaphore, "usage": usage, "window": (start_date, end_date)}
+            outcomes = await asyncio.gather(
+                *[
+                    self._search_query(run, q, start_date, end_date, limit, exclude_keywords)
+                    for q in queries
+                ],
+                return_exceptions=True
+            )
+
+        results, errors = {}, {}
+        for query, outcome in zip(queries, outcomes):
+            if isinstance(outcome, Exception):
+                errors[query] = outcome
+            else:
+                results[query] = outcome
+        return results, errors
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        return delay * random.uniform(0.5, 1.5)
+
+    async def _fetch_page(self, run, query, start):
+        cache_key = (normalize_query(query), start, PAGE_SIZE, "date")
+        data = self.response_cache.get(cache_key)
+        if data is not None:
+            run["usage"]["cache_hits"] += 1
+            return data
+        run["usage"]["cache_misses"] += 1
+
+        key = (normalize_query(query), run["window"], start)
+        data, shared = await self.single_flight.do(key, lambda: self._request_page(run, query, start))
+        if shared:
+            run["usage"]["shared"] += 1
+        else:
+            self.response_cache.put(cache_key, data)
+        return data
+
+    async def _request_page(self, run, query, start):
+        params = {
+            "query": query,
+            "display": PAGE_SIZE,
+            "start": start,
+            "sort": "date"
+        }
+        usage = run["usage"]
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            usage["calls"] += 1
+            retry_after = None
+            try:
+                async with run["semaphore"]:
+                    async with run["session"].get(NAVER_NEWS_URL, params=params) as response:
+                        if response.status == 200:
+                            return await response.json(content_type=None)
+                        if response.status not in self.RETRY_STATUS:
+                            raise NaverAPIError(f"HTTP {response.status}: {(await response.text())[:200]}")
+                        if response.status == 429:
+                            usage["throttled"] += 1
+                        retry_after = response.headers.get("Retry-After")
+                        error = NaverAPIError(f"HTTP {response.status}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = NaverAPIError(f"네트워크 오류: {e!r}")
+            if attempt < self.max_retries:
+                usage["retries"] += 1
+                await asyncio.sleep(self._backoff_delay(attempt, retry_after))
+        raise error
+
+    async def _fetch_pages(self, run, query, boundary, limit):
+        """
+        최신순으로 boundary(기간 시작일 또는 워터마크)까지 페이지를 받아 온다.
+        반환: (item 리스트, 끊김 없이 경계 또는 마지막 결과까지 도달했는지 여부)
+        1페이지 실패는 예외로 전달, 이후 페이지 실패는 그 앞까지만 사용하고 usage["truncated"]에 기록
+        """
+        first = await self._fetch_page(run, query, 1)
+
+        pages = [first.get("items", [])]
+        last_start = min(int(first.get("total", 0) or 0), limit, MAX_START)
+        next_start = 1 + PAGE_SIZE
+        complete = len(pages[0]) < PAGE_SIZE or self.planner.passed_window(pages[0], boundary)
+        failed = False
+        since = boundary.date() if isinstance(boundary, datetime) else boundary
+
+        while not (complete or failed) and next_start <= last_start:
+            # 예측한 총 페이지 수에서 이미 받은 페이지를 뺀 만큼을 한 wave로 동시에 요청
+            # (예측이 모자라면 다음 wave에서 1페이지씩 더 내려감)
+            wanted = self.planner.predict_pages(query, since, first_page_items=pages[0]) - len(pages)
+            starts = list(range(next_start, last_start + 1, PAGE_SIZE))[:max(wanted, 1)]
+            wave = await asyncio.gather(
+                *[self._fetch_page(run, query, s) for s in starts],
+                return_exceptions=True
+            )
+            next_start = starts[-1] + PAGE_SIZE
+            for data in wave:
+                if isinstance(data, Exception):
+                    failed = True  # 실패한 페이지 이후는 버림
+                    run["usage"]["truncated"].append(query)
+                    break
+                items = data.get("items", [])
+                pages.append(items)
+                if len(items) < PAGE_SIZE or self.planner.passed_window(items, boundary):
+                    complete = True
+                    break
+
+        return [item for items in pages for item in items], complete
+
+    async def _search_query(self, run, query, start_date, end_date, limit, exclude_keywords):
+        state = self.store.sync_state(query) if self.store else None
+        # 저장소가 start_date부터 연속으로 보유 중이면 워터마크 이후만 새로 받음
+        incremental = bool(state and start_date and state["covered_from"] <= start_date)
+
+        if incremental and self.store.is_fresh(state):
+            fetched = None
+        else:
+            boundary = state["watermark"] if incremental else start_date
+            fetched = await self._fetch_pages(run, query, boundary, limit)
+
+        if fetched is not None:
+            items, complete = fetched
+            if not incremental:
+                self.planner.observe(query, items)
+            if self.store:
+                covered_from = state["covered_from"] if incremental else (start_date or date.min)
+                self.store.save(query, items, covered_from, complete, previous_state=state if incremental else None)
+
+        if self.store:
+            items = self.store.load(query, start_date, end_date)
+
+        articles = []
+        for item in items:
+            article, pub_date = parse_naver_item(item)
+            if start_date and pub_date < start_date:
+                continue
+            if end_date and pub_date > end_date:
+                continue
+            if exclude_by_title_keywords(article["title"], exclude_keywords):
+                continue
+            articles.append(article)
+        return articles[:limit]
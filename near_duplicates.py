@@ -0,0 +1,114 @@
+import difflib
+from collections import Counter
+
+import numpy as np
+
+
+class _Postings:
+    """문자 하나가 들어간 대표 제목 id와 그 문자 개수 (용량을 두 배씩 늘리는 배열)"""
+
+    __slots__ = ("ids", "counts", "size")
+
+    def __init__(self):
+        self.ids = np.empty(8, dtype=np.int32)
+        self.counts = np.empty(8, dtype=np.int32)
+        self.size = 0
+
+    def append(self, cluster_id, count):
+        if self.size == len(self.ids):
+            self.ids = np.resize(self.ids, 2 * self.size)
+            self.counts = np.resize(self.counts, 2 * self.size)
+        self.ids[self.size] = cluster_id
+        self.counts[self.size] = count
+        self.size += 1
+
+
+class NearDuplicateIndex:
+    """
+    기사 제목 유사 중복 인덱스 (문자 역색인 + quick_ratio 상한)
+    - add(title): 이미 등록된 대표 제목 중 유사한 것이 있으면 그 클러스터 id, 없으면 새 클러스터 생성
+    - 새 제목과 모든 대표 제목의 공통 문자 수(SequenceMatcher.quick_ratio의 분자)를 문자별 역색인으로
+      한 번에(numpy) 계산 → quick_ratio < threshold인 대표 제목은 ratio()를 부르지 않음
+    - quick_ratio >= ratio이므로 걸러진 쌍은 is_similar도 False → 전체 1:1 비교와 같은 결과 (근사 없음)
+    - 후보 중 먼저 등록된 대표 제목부터 확인하므로 '앞에 나온 기사를 남긴다'는 기존 규칙과 동일
+    같은 기업 제목끼리 공유하는 검색어/공백은 상한에만 더해지고, SequenceMatcher 비교는 실제로
+    기준에 근접한 쌍에서만 일어난다.
+    """
+
+    def __init__(self, threshold=0.5):
+        self.threshold = threshold
+        self._postings = {}    # 문자 → _Postings
+        self._lengths = np.empty(64, dtype=np.int64)  # 클러스터 id → 대표 제목 길이
+        self._titles = []      # 클러스터 id → 대표 제목
+        self._matchers = []    # 클러스터 id → 대표 제목을 seq2로 고정한 SequenceMatcher (b 쪽 색인 재사용)
+        self._sizes = []       # 클러스터 id → 묶인 기사 수
+        self.comparisons = 0   # ratio() 호출 수 (후보 검사 횟수)
+
+    def __len__(self):
+        return len(self._titles)
+
+    def _candidates(self, title, counts):
+        n = len(self._titles)
+        if not n:
+            return ()
+        # 문자별 (대표 제목 id, min(개수)) → bincount 한 번으로 공통 문자 수 합산
+        single, repeated, weights = [], [], []
+        for ch, count in counts.items():
+            postings = self._postings.get(ch)
+            if postings is None:
+                continue
+            ids = postings.ids[:postings.size]
+            if count == 1:
+                single.append(ids)
+            else:
+                repeated.append(ids)
+                weights.append(np.minimum(postings.counts[:postings.size], count))
+        matches = np.bincount(np.concatenate(single), minlength=n) if single else np.zeros(n, dtype=np.int64)
+        if repeated:
+            matches = matches + np.bincount(np.concatenate(repeated), weights=np.concatenate(weights), minlength=n)
+        # difflib._calculate_ratio와 같은 계산식 (길이 합 0이면 1.0)
+        lengths = self._lengths[:n] + len(title)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            quick = np.where(lengths > 0, 2.0 * matches / lengths, 1.0)
+        return np.flatnonzero(quick >= self.threshold)
+
+    def _is_similar(self, title, cluster_id):
+        # is_similar(title, existing_title)과 같은 인자 순서: seq1=새 제목, seq2=대표 제목
+        # (real_quick_ratio/quick_ratio 단계는 _candidates에서 이미 통과)
+        self.comparisons += 1
+        matcher = self._matchers[cluster_id]
+        matcher.set_seq1(title)
+        return matcher.ratio() >= self.threshold
+
+    def add(self, title):
+        """반환: (cluster_id, is_new) — is_new가 False면 기존 클러스터의 중복 기사"""
+        title = title or ""
+        counts = Counter(title)
+        for cluster_id in self._candidates(title, counts):
+            cluster_id = int(cluster_id)
+            if self._is_similar(title, cluster_id):
+                self._sizes[cluster_id] += 1
+                return cluster_id, False
+
+        cluster_id = len(self._titles)
+        if cluster_id == len(self._lengths):
+            self._lengths = np.resize(self._lengths, 2 * cluster_id)
+        self._lengths[cluster_id] = len(title)
+        self._titles.append(title)
+        self._matchers.append(difflib.SequenceMatcher(None, "", title))
+        self._sizes.append(1)
+        for ch, count in counts.items():
+            postings = self._postings.get(ch)
+            if postings is None:
+                postings = self._postings[ch] = _Postings()
+            postings.append(cluster_id, count)
+        return cluster_id, True
+
+    def cluster_size(self, cluster_id):
+        return self._sizes[cluster_id]
+
+
+def cluster_duplicates(articles, index=None):
+    """기사 순서대로 (cluster_id, is_new) 목록 반환 (index를 넘기면 이전 호출에 이어서 증분 등록)"""
+    index = index if index is not None else NearDuplicateIndex()
+    return [index.add(article.get("title", "")) for article in articles]
@@ -0,0 +1,1820 @@
+"""
+Streamlit 없이 사용할 수 있는 뉴스 수집/필터/요약/엑셀 파이프라인
+
+세션 상태가 필요한 함수는 state 인자(매핑)를 받는다.
+- Streamlit 화면: st.session_state를 그대로 전달
+- 배치 실행(batch_report.py): new_state()로 만든 dict를 전달
+"""
+import os
+import re
+import json
+import logging
+import difflib
+import hashlib
+import uuid
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import lxml.html
+import telepot
+from lxml.cssselect import CSSSelector
+from openai import OpenAI
+
+from naver_news import NaverNewsEngine, filter_by_issues
+from article_store import ArticleStore
+from near_duplicates import cluster_duplicates
+from article_registry import ArticleRegistry, article_registry, article_key
+from summary_store import get_summary_store
+from article_text_cache import get_text_cache
+from download_scheduler import get_download_scheduler
+from article_prefetch import PrefetchJob
+from llm_cache import get_llm_cache, text_hash
+from openai_dispatcher import get_openai_dispatcher
+from token_budget import count_tokens, get_token_budget, trim_to_budget
+from keyword_matcher import KeywordMatcher, compile_keywords
+from credit_prescorer import CreditImpactScorer
+
+logger = logging.getLogger(__name__)
+
+# --- config.json 로드 ---
+with open("config.json", "r", encoding="utf-8") as f:
+    config = json.load(f)
+
+EXCLUDE_TITLE_KEYWORDS = config["EXCLUDE_TITLE_KEYWORDS"] # --- 제외 키워드 ---
+ALLOWED_SOURCES = set(config["ALLOWED_SOURCES"]) # 필터링할 언론사 도메인 리스트 (www. 제거된 도메인 기준)
+favorite_categories = config["favorite_categories"] # --- 즐겨찾기 카테고리(변경 금지) ---
+excel_company_categories = config["excel_company_categories"]
+common_filter_categories = config["common_filter_categories"] # --- 공통 필터 옵션(대분류/소분류 없이 모두 적용) ---
+industry_filter_categories = config["industry_filter_categories"] # --- 산업별 필터 옵션 ---
+SYNONYM_MAP = config["synonym_map"]
+kiscd_map = config.get("kiscd_map", {})
+kr_compcd_map = config.get("kr_COMP_CD_map", {})
+
+# 공통 필터 키워드 전체 리스트 생성
+ALL_COMMON_FILTER_KEYWORDS = []
+for keywords in common_filter_categories.values():
+    ALL_COMMON_FILTER_KEYWORDS.extend(keywords)
+
+# 제외/공통/산업별 키워드를 카테고리 태그와 함께 한 번에 컴파일 (기사 텍스트는 한 번만 훑음)
+FILTER_MATCHER = KeywordMatcher({
+    "exclude": EXCLUDE_TITLE_KEYWORDS,
+    **{f"common:{major}": subs for major, subs in common_filter_categories.items()},
+    **{f"industry:{major}": subs for major, subs in industry_filter_categories.items()},
+})
+
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+NAVER_CLIENT_ID = os.environ.get("NAVER_CLIENT_ID")
+NAVER_CLIENT_SECRET = os.environ.get("NAVER_CLIENT_SECRET")
+TELEGRAM_TOKEN = os.environ.get("TELEGRAM_TOKEN")
+TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
+
+def new_state(**overrides):
+    """세션 상태 기본값 (Streamlit 세션 초기화와 배치 실행이 공유)"""
+    state = {
+        "favorite_keywords": set(),
+        "search_results": {},
+        "show_limit": {},
+        "search_triggered": False,
+        "selected_articles": [],
+        "cat_multi": [],
+        "cat_major_autoset": [],
+        "important_articles_preview": [],
+        "important_selected_index": [],
+        "article_checked_left": {},
+        "article_checked": {},
+        "industry_major_sub_map": {},
+        "end_date": datetime.today().date(),
+        "start_date": datetime.today().date() - timedelta(days=7),
+        "remove_duplicate_articles": True,
+        "require_exact_keyword_in_title_or_content": True,
+        "filter_allowed_sources_only": False,
+        "use_industry_filter": True,
+        "show_sentiment_badge": False,
+        "enable_summary": True,
+        "keyword_input": "",
+        "fetch_job_id": None,
+        "last_search_key": None,
+        "last_search_report": None,
+        "search_frame": None,
+        "filter_verdicts": None,
+        "filtered_results_memo": None,
+        "dedupe_clusters": None,
+        "prefetch_articles": False,
+        "prefetch_job": None,
+        "article_registry": ArticleRegistry(),
+        "session_id": uuid.uuid4().hex
+    }
+    state.update(overrides)
+    return state
+
+@lru_cache(maxsize=None)
+def get_openai_client():
+    return OpenAI(api_key=OPENAI_API_KEY)
+
+@lru_cache(maxsize=None)
+def get_naver_engine():
+    """프로세스 단위로 하나만 생성 (페이지 예측 통계/로컬 저장소/캐시를 rerun 간 공유)"""
+    return NaverNewsEngine(NAVER_CLIENT_ID, NAVER_CLIENT_SECRET, store=ArticleStore())
+
+def expand_keywords_with_synonyms(original_keywords):
+    expanded_map = {}
+    for kw in original_keywords:
+        synonyms = SYNONYM_MAP.get(kw, [])
+        expanded_map[kw] = [kw] + synonyms
+    return expanded_map
+
+def format_naver_usage(usage):
+    return (
+        f"네이버 API 사용량: 이번 검색 {usage['calls']}회 (재시도 {usage['retries']}회, 429 {usage['throttled']}회, "
+        f"중복 요청 공유 {usage['shared']}건) "
+        f"| 오늘 누적 {usage['used_today']:,} / {usage['daily_quota']:,} "
+        f"| 응답 캐시 적중 {usage['cache_hits']} / 미적중 {usage['cache_misses']} "
+        f"(누적 적중률 {usage['cache']['hit_rate']:.0%})"
+    )
+
+def format_token_savings(stats):
+    """TokenBudget.snapshot() → 요약 프롬프트 토큰 절감 한 줄"""
+    return (
+        f"요약 프롬프트 토큰: {stats['calls']}회 호출, {stats['prompt_tokens']:,} 사용 "
+        f"(원래 {stats['original_tokens']:,} → {stats['saved_tokens']:,} 절감)"
+    )
+
+def process_keywords_with_synonyms(favorite_to_expand_map, start_date, end_date, require_keyword_in_title=False, *,
+                                   state, warn=logger.warning):
+    """
+    1차: require_keyword_in_title 플래그(체크박스 설정)에 따라 강한 필터로 검색
+    2차: 기업(main_kw)별 결과가 0건인 경우에만
+         -> 해당 기업에 한해 '제목/본문 키워드 포함' 조건을 해제하고 재검색(Fallback)
+    모든 기업의 (검색어, 페이지) 요청은 get_naver_engine()으로 한 번에 동시 실행하며,
+    Fallback은 이미 받은 원본 결과에 조건만 바꿔 다시 적용한다 (추가 API 호출 없음).
+    결과는 state["search_results"]에 기업별로 저장하고(state 필수, new_state() 등), 네이버 API 사용량 dict를 반환한다.
+    warn: 경고 메시지 출력 함수 (기본: 모듈 logger)
+    """
+    all_queries = [kw for kw_list in favorite_to_expand_map.values() for kw in kw_list]
+    fetched_map, errors, usage = get_naver_engine().search(
+        all_queries, start_date, end_date, exclude_keywords=EXCLUDE_TITLE_KEYWORDS
+    )
+    if usage["truncated"]:
+        warn(f"일부 페이지 조회 실패로 결과가 잘린 검색어: {', '.join(usage['truncated'])}")
+
+    def collect(main_kw, kw_list, require_title, label=""):
+        collected = []
+        for search_kw in kw_list:
+            if search_kw in errors:
+                warn(f"{label}{main_kw} - '{search_kw}' 검색 실패: {errors[search_kw]}")
+                continue
+            fetched = [
+                a for a in fetched_map.get(search_kw, [])
+                if filter_by_issues(a["title"], a["description"], [search_kw], require_title)
+            ]
+            # 각 기사에 검색어 정보 추가
+            collected.extend({**a, "검색어": search_kw} for a in fetched)
+        return collected
+
+    for main_kw, kw_list in favorite_to_expand_map.items():
+        # 🔹 1차 검색: 현재 설정(require_keyword_in_title)을 그대로 적용
+        all_articles = collect(main_kw, kw_list, require_keyword_in_title)
+
+        # 🔸 Fallback 조건:
+        #  - 1차 검색 결과가 0건이고
+        #  - 전역 체크박스(키워드가 제목 또는 본문에 포함…)가 켜져 있을 때만
+        if (
+            len(all_articles) == 0
+            and state.get("require_exact_keyword_in_title_or_content", False)
+        ):
+            # 2차 검색: 이 main_kw(기업)에 한해서만 제목/본문 키워드 필터 해제
+            all_articles = collect(main_kw, kw_list, False, label="[Fallback] ")
+
+        # 🔹 중복 기사 제거 옵션 적용
+        if state.get("remove_duplicate_articles", False):
+            all_articles = remove_duplicates(all_articles)
+
+        # 🔹 최종 결과 저장
+        state["search_results"][main_kw] = all_articles
+        if main_kw not in state["show_limit"]:
+            state["show_limit"][main_kw] = 5
+
+    return usage
+
+def build_search_job(favorite_to_expand_map, start_date, end_date, state):
+    """검색 작업 1건을 JSON 직렬화 가능한 dict로 구성 (워커 큐 전달 / 같은 조건 재검색 판별용)"""
+    return {
+        "keywords": favorite_to_expand_map,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "require_exact_keyword_in_title_or_content": bool(state.get("require_exact_keyword_in_title_or_content", False)),
+        "remove_duplicate_articles": bool(state.get("remove_duplicate_articles", False)),
+    }
+
+def run_search_job(job):
+    """
+    build_search_job()으로 만든 작업을 실행 (fetch_worker.py 워커와 화면 내 직접 실행이 공유)
+    반환: {"search_results": 기업별 기사, "usage": 네이버 API 사용량, "warnings": 경고 메시지 목록}
+    """
+    warnings = []
+    state = new_state(
+        require_exact_keyword_in_title_or_content=job["require_exact_keyword_in_title_or_content"],
+        remove_duplicate_articles=job["remove_duplicate_articles"],
+    )
+    usage = process_keywords_with_synonyms(
+        job["keywords"],
+        date.fromisoformat(job["start_date"]),
+        date.fromisoformat(job["end_date"]),
+        require_keyword_in_title=job["require_exact_keyword_in_title_or_content"],
+        state=state,
+        warn=warnings.append
+    )
+    return {"search_results": state["search_results"], "usage": usage, "warnings": warnings}
+
+def apply_search_result(result, state):
+    """run_search_job() 결과를 세션 상태에 반영 (기사 레지스트리에 기업/검색어 매핑도 등록)"""
+    article_registry(state).register_results(result["search_results"])
+    for main_kw, articles in result["search_results"].items():
+        state["search_results"][main_kw] = articles
+        if main_kw not in state["show_limit"]:
+            state["show_limit"][main_kw] = 5
+
+# --- 카테고리-산업 대분류 매핑 함수 ---
+def get_industry_majors_from_favorites(selected_categories):
+    favorite_to_industry_major = config["favorite_to_industry_major"]
+    majors = set()
+    for cat in selected_categories:
+        for major in favorite_to_industry_major.get(cat, []):
+            majors.add(major)
+    return list(majors)
+
+def detect_lang(text):
+    return "ko" if re.search(r"[가-힣]", text) else "en"
+
+def get_industry_credit_keywords():
+    return """
+보험사: 수익성, 자본적정성, IFRS17, K-ICS, 리스크관리, 손해율, 재보험, 유동성, 투자자산, 스트레스테스트, 경영투명성, 내부통제, 시장지위, 자금조달, 정책, 규제, 대체투자, 손익변동, 지급여력, 계약유지율, 위험집중, 체증률, 보험금지급
+5대금융지주 및 은행: 자회사 신용도, 배당, 자산건전성, 정부지원, 자본비율, 유동성비율, 대손충당금, 레버리지, 스트레스, 시장위험, 금리위험, 비이자수익, 다각화, 거버넌스, 규제준수, 운영위험, 단기부채, 구조조정, 부실채권, 조기경보, 유가증권
+카드사: 시장점유율, 수수료율, 대손비용, 자산건전성, 신용리스크, 대손율, 상환능력, 포트폴리오, 수익성, 거래량, 운영리스크, 법률, 파트너십, 비용, 금융조달, 신용지원, 경쟁력, 가격책정, 승인거래액, 부정사용, 결제연체
+캐피탈: 사업통합, 수익안정성, 자산건전성, 해외시장, 부실률, 자금조달, 유동성, 이익창출력, 성장성, 신용리스크, 시장리스크, 법적제약, 내부통제, 채권포트폴리오, 파생상품, 그룹지원, 사업다각화, 리스크집중도, 대출채권, 부실채권비율, 회수율
+지주사: 자회사 신용도, 배당안정성, 재무부담, 그룹신용, 지배구조, 재무레버리지, 부채만기, 신용지원, 수익안정성, 자본조달, 자산건전성, 현금흐름, 자본성증권, 투자리스크, 전략지원, 지분율, 내부거래, 경영권위험
+에너지: 시장경쟁, 사업다각화, 해외실적, 투자규모, 가격변동성, 재무안정성, 정책변화, 환경규제, 현금흐름, 프로젝트집행, 재무파생상품리스크, 부채구조, 자본조달, 공급망, 기술전환, 글로벌경제, 탄소배출권, 에너지수급, 정부지원
+발전: 전력기반, 설비투자, 전력가격, 가동률, 계약, 연료비, 부채, 자본구조, 배당정책, 재무유연성, 정부규제, 환경법규, 현금흐름, 투자계획, 차입금, 기술리스크, 사업다각화, 시장수요, 발전효율, 신재생에너지, 정부보조금
+자동차: 배터리시장, 전기차수요, 설비투자, 수익성, 시장점유율, 기술경쟁력, 매출다각화, 레버리지, 고정비, 생산능력, 신제품개발, 정부정책, 공급망, 자본지출, 연구개발, 현금흐름, 성장전망, 경쟁환경, 친환경차, 관세정책
+전기전자: 반도체시장, AI수요, 무역규제, 기술우위, 제품수요, 관세, 투자계획, 생산시설, 재무안정성, 연구개발, 공급망, 진입장벽, 운영효율, 환율, 보안, 가격경쟁력, 인재확보, 재무정책, 기술특허, 보안위협
+소비재: 유통변화, M&A재무부담, 온라인사업, 유통채널, 브랜드, 시장점유율, 영업이익률, 현금흐름, 재무건전성, 재고관리, 경쟁압력, 혁신, 고객충성도, 비용, 공급망, 신용지원, 매출성장, 신제품런칭, 고객확보
+비철철강: 수요공급, 가격변동, 해외프로젝트, 친환경설비, 비용, 자본지출, 실행력, 환경규제, 부채, 현금흐름, 시장다변화, 상품포트폴리오, 경쟁, 공급망, 기술전환, 원자재가격, 수출비중
+석유화학: 경쟁력, 포트폴리오, 투자, 차입금, 세제, 재무관리, 업황민감도, 차입금비율, 자금조달, 인수합병, 수익성, 현금흐름, 자산유동화, 리스크분산, 시장점유율, 비용, 비핵심자산, 프로젝트관리, 세제혜택
+특수채: 준정부기관, 보증시장, 보증사고, 자본확충, 정부지원, 신용연계, 보증잔액, 리스크, 현금성자산, 단기부채, 미회수채권, 자산건전성, 운영안정성, 보증한도, 재무안정성, 시장지위, 관리체계, 정책, 채권발행, 지급유예, 불확실성
+"""
+@lru_cache(maxsize=None)
+def _company_categories():
+    """기업명 → 즐겨찾기 카테고리 목록"""
+    categories = {}
+    for cat, companies in favorite_categories.items():
+        for company in companies:
+            categories.setdefault(company, []).append(cat)
+    return categories
+
+@lru_cache(maxsize=1024)
+def issuer_industry_keywords(target_keyword=None):
+    """
+    대상 기업 섹터의 신용평가 키워드 줄만 (즐겨찾기 카테고리 → favorite_to_industry_major로 매핑)
+    - 카테고리명이나 산업 대분류명('은행 및 금융지주' → 은행/금융지주)이 섹터명에 들어 있으면 해당 섹터
+    - 즐겨찾기에 없는 기업(또는 None)은 기존처럼 전체 블록, 매핑되는 섹터가 없으면 빈 블록
+    """
+    categories = _company_categories().get(target_keyword)
+    if not categories:
+        return get_industry_credit_keywords()
+    names = set(categories) | set(get_industry_majors_from_favorites(categories))
+    parts = {
+        part for name in names
+        for part in re.split(r"\s*및\s*|/|\s+", name) if len(part) >= 2
+    }
+    lines = []
+    for line in get_industry_credit_keywords().strip().splitlines():
+        sector = re.sub(r"[\s/]", "", line.split(":", 1)[0])
+        if any(part in sector for part in parts):
+            lines.append(line)
+    return "\n".join(lines) if lines else "(해당 섹터 키워드 없음)"
+
+def _budgeted_prompt(template, target_keyword, text_field, texts, join=None):
+    """
+    섹터 키워드를 대상 기업 것만 넣고 본문을 SUMMARY_BODY_TOKEN_BUDGET 안으로 줄인 프롬프트
+    - texts: 본문 하나 또는 {기사 id: 본문} (join으로 묶어 text_field에 넣음)
+    - 전체 키워드 + 원문 그대로였을 때와 비교한 절감 토큰을 호출마다 기록
+    """
+    join = join or (lambda value: value)
+    if isinstance(texts, dict):
+        trimmed = {k: trim_to_budget(v, SUMMARY_BODY_TOKEN_BUDGET) for k, v in texts.items()}
+    else:
+        trimmed = trim_to_budget(texts, SUMMARY_BODY_TOKEN_BUDGET)
+    prompt = template.format(**{
+        "industry_keywords": issuer_industry_keywords(target_keyword),
+        "target_keyword": target_keyword or 'N/A',
+        text_field: join(trimmed),
+    })
+    original = template.format(**{
+        "industry_keywords": get_industry_credit_keywords(),
+        "target_keyword": target_keyword or 'N/A',
+        text_field: join(texts),
+    })
+    get_token_budget().record(count_tokens(original), count_tokens(prompt))
+    return prompt
+
+# --- 요약 프롬프트 (문구를 고치면 SUMMARY_PROMPT_VERSION이 바뀌어 이전 캐시 결과는 쓰지 않음) ---
+SUMMARY_MODEL = "gpt-4o-mini"                # 기존 gpt-3.5-turbo → gpt-4o-mini
+SUMMARY_SYSTEM_PROMPT = "너는 신용평가사 애널리스트다. 사실 기반으로만 판단하고 과장/추측을 피한다."
+SUMMARY_FORMAT_SPEC = """요구 형식:
+1. [한 줄 요약]: 사실 중심. 누가/무엇을/언제/어떻게 한 일을 한 문장으로.
+2. [심층 시사점]: 신용평가사의 코멘트 형식으로 등급/전망/재무안정성/현금흐름/유동성/사업·규제 환경 영향 분석(3문장 이상, 과도한 일반화 금지).
+3. [한 줄 시사점]: 영향의 핵심 포인트만 압축(예: '차입 확대로 단기유동성 부담 상승').
+4. [감성]: 긍정/부정/중립 중 하나.
+5. [검색 키워드]: 대상 기업명 또는 주요 엔티티 위주로 콤마 구분.
+6. [주요 키워드]: 인물/기업/기관명 중심으로 콤마 구분. 없으면 '없음'.
+"""
+SUMMARY_PROMPT_TEMPLATE = """
+[참고: 산업군별 신용평가 키워드(참고용)]
+{industry_keywords}
+
+아래 [기사 본문]을 분석해 지정된 형식으로만 응답하시오.
+대상 기업: "{target_keyword}"
+
+""" + SUMMARY_FORMAT_SPEC + """
+[기사 본문]
+{text}
+"""
+# 같은 대상 기업 기사 여러 건을 한 요청으로 (참고 키워드 블록은 한 번만 전송)
+SUMMARY_BATCH_PROMPT_TEMPLATE = """
+[참고: 산업군별 신용평가 키워드(참고용)]
+{industry_keywords}
+
+아래 [기사 목록]의 기사를 각각 따로 분석해 기사마다 지정된 형식으로만 응답하시오.
+대상 기업: "{target_keyword}"
+각 기사 응답은 반드시 "=== 기사 <기사 ID> ===" 한 줄로 시작하고, 기사 ID는 주어진 값을 그대로 쓴다.
+모든 기사에 대해 빠짐없이 응답하시오.
+
+""" + SUMMARY_FORMAT_SPEC + """
+[기사 목록]
+{articles}
+"""
+SUMMARY_BATCH_ARTICLE_TEMPLATE = "=== 기사 {article_id} ===\n{text}\n"
+SUMMARY_BATCH_SIZE = 5                       # 한 요청에 묶는 최대 기사 수
+SUMMARY_MAX_TOKENS = 900
+SUMMARY_TEMPERATURE = 0.3                    # 0 → 0.3: 억지스러움 완화, 문장 자연스러움 개선
+SUMMARY_BODY_TOKEN_BUDGET = int(os.environ.get("SUMMARY_BODY_TOKEN_BUDGET", 2000))  # 기사 1건 본문 입력 상한(토큰)
+
+def _prompt_version(template):
+    return hashlib.sha1("\x1f".join([
+        SUMMARY_SYSTEM_PROMPT, template, get_industry_credit_keywords(),
+        str(SUMMARY_MAX_TOKENS), str(SUMMARY_TEMPERATURE), str(SUMMARY_BODY_TOKEN_BUDGET), "issuer-sector"
+    ]).encode("utf-8")).hexdigest()[:12]
+
+SUMMARY_PROMPT_VERSION = _prompt_version(SUMMARY_PROMPT_TEMPLATE)
+SUMMARY_BATCH_PROMPT_VERSION = _prompt_version(SUMMARY_BATCH_PROMPT_TEMPLATE + SUMMARY_BATCH_ARTICLE_TEMPLATE)
+# 단건/묶음 요청은 같은 형식의 결과를 내므로 캐시 조회 시 둘 다 사용
+SUMMARY_CACHE_VERSIONS = (SUMMARY_PROMPT_VERSION, SUMMARY_BATCH_PROMPT_VERSION)
+BATCH_ARTICLE_HEADER_RE = re.compile(r"^=+\s*기사\s*([^\s=]+)\s*=+\s*$", re.M)
+
+def parse_summary_answer(answer):
+    """모델 응답 → (one_line_summary, keywords, sentiment, detailed_implication, short_implication)"""
+    def extract_group(tag):
+        # 태그별 블록 추출
+        pattern = rf"\[{tag}\]:\s*([\s\S]+?)(?=\n\[\w+\]:|\n\d+\. \[|$)"
+        m = re.search(pattern, answer)
+        return m.group(1).strip() if m else ""
+
+    one_line = extract_group("한 줄 요약") or "요약 추출 실패"
+    detailed_implication = extract_group("심층 시사점") or "시사점 추출 실패"
+    short_implication = extract_group("한 줄 시사점") or "한 줄 시사점 요약 실패"
+    sentiment = extract_group("감성") or "감성 추출 실패"
+    keywords = extract_group("검색 키워드") or ""
+
+    # 감성 표준화
+    s = sentiment.strip().lower()
+    if "긍" in s or "positive" in s:
+        sentiment = "긍정"
+    elif "부" in s or "negative" in s:
+        sentiment = "부정"
+    elif "중립" in s or "neutral" in s:
+        sentiment = "중립"
+    else:
+        sentiment = "감성 추출 실패"
+
+    return one_line, keywords, sentiment, detailed_implication, short_implication
+
+def summarize_and_sentiment_with_openai(text, do_summary=True, target_keyword=None, llm_cache=None, queue_key=None):
+    """
+    반환: (one_line_summary, keywords, sentiment, detailed_implication, short_implication, original_text)
+    - 한 줄 요약: '무슨 일이 일어났는가' (사실 중심)
+    - 심층 시사점: 신용평가 코멘트 형식(등급/전망/유동성/현금흐름 등 영향) 3문장 이상
+    - 한 줄 시사점: 영향의 핵심 포인트만 축약
+    - 감성: 긍정/부정/중립
+    결과는 (본문 해시, 프롬프트 버전, 모델, 대상 기업) 단위로 LLMResultCache에 보관 → 다른 세션/다음 배치에서 재사용
+    호출은 프로세스 공유 OpenAIDispatcher를 거침 (queue_key: 공정 큐 키, openai_queue_key 참고)
+    do_summary=False면 OpenAI 호출 없이 요약/감성/시사점을 빈 값으로 반환
+    """
+    if not do_summary:
+        return "", "", "", "", "", text
+    if not OPENAI_API_KEY:
+        return "OpenAI API 키가 설정되지 않았습니다.", "", "감성 추출 실패", "", "", text
+    if not text or "본문 추출 오류" in text:
+        return "기사 본문이 추출 실패", "", "감성 추출 실패", "", "", text
+
+    llm_cache = llm_cache or get_llm_cache()
+    cached = llm_cache.get(text, SUMMARY_CACHE_VERSIONS, SUMMARY_MODEL, target_keyword)
+    if cached:
+        return (*cached, text)
+
+    try:
+        response = get_openai_dispatcher().create(queue_key=queue_key, **summary_request(text, target_keyword))
+        answer = response.choices[0].message.content.strip()
+    except Exception as e:
+        return f"요약 오류: {e}", "", "감성 추출 실패", "", "", text
+
+    fields = parse_summary_answer(answer)
+    # 형식을 벗어난 응답은 저장하지 않음 (다음에 다시 요청)
+    if fields[0] != "요약 추출 실패":
+        llm_cache.put(text, SUMMARY_PROMPT_VERSION, SUMMARY_MODEL, target_keyword, fields)
+    return (*fields, text)
+
+def summary_request(text, target_keyword=None):
+    """기사 1건 요약 chat.completions 요청 인자 (온라인 호출과 오프라인 Batch API가 같은 요청 사용)"""
+    prompt = _budgeted_prompt(SUMMARY_PROMPT_TEMPLATE, target_keyword, "text", text)
+    return {
+        "model": SUMMARY_MODEL,
+        "messages": [
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": SUMMARY_MAX_TOKENS,
+        "temperature": SUMMARY_TEMPERATURE,
+    }
+
+def _summarize_chunk_with_openai(texts, target_keyword, queue_key=None):
+    """기사 여러 건을 한 요청으로 요약 → {기사 id: 결과 5필드} (응답에서 빠진 기사는 없음)"""
+    prompt = _budgeted_prompt(
+        SUMMARY_BATCH_PROMPT_TEMPLATE, target_keyword, "articles", texts,
+        join=lambda bodies: "\n".join(
+            SUMMARY_BATCH_ARTICLE_TEMPLATE.format(article_id=article_id, text=text) for article_id, text in bodies.items()
+        )
+    )
+    response = get_openai_dispatcher().create(
+        queue_key=queue_key,
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=SUMMARY_MAX_TOKENS * len(texts),
+        temperature=SUMMARY_TEMPERATURE
+    )
+    answer = response.choices[0].message.content.strip()
+
+    # "=== 기사 <id> ===" 머리줄 기준으로 나눠 기사별로 기존 파서 적용
+    parts = BATCH_ARTICLE_HEADER_RE.split(answer)
+    return {
+        article_id: parse_summary_answer(block.strip())
+        for article_id, block in zip(parts[1::2], parts[2::2])
+        if article_id in texts
+    }
+
+def summarize_texts_with_openai(texts, target_keyword=None, batch_size=SUMMARY_BATCH_SIZE, llm_cache=None,
+                                queue_key=None):
+    """
+    같은 대상 기업 기사 여러 건 요약: {기사 id: 본문} → {기사 id: 6-튜플 (summarize_and_sentiment_with_openai와 동일)}
+    - 캐시에 없는 기사만 batch_size개씩 한 요청으로 묶어 보냄 (참고 키워드 블록/왕복을 기사 수만큼 반복하지 않음)
+    - 묶음 응답에서 빠졌거나 형식이 깨진 기사는 단건으로 다시 요청
+    """
+    llm_cache = llm_cache or get_llm_cache()
+    results = {}
+    pending = {}
+    for article_id, text in texts.items():
+        cached = None
+        if OPENAI_API_KEY and text and "본문 추출 오류" not in text:
+            cached = llm_cache.get(text, SUMMARY_CACHE_VERSIONS, SUMMARY_MODEL, target_keyword)
+            if not cached:
+                pending[article_id] = text
+                continue
+        results[article_id] = (*cached, text) if cached else summarize_and_sentiment_with_openai(
+            text, target_keyword=target_keyword, llm_cache=llm_cache, queue_key=queue_key
+        )
+
+    ids = list(pending)
+    for start in range(0, len(ids), max(batch_size, 1)):
+        chunk = {article_id: pending[article_id] for article_id in ids[start:start + batch_size]}
+        parsed = {}
+        if len(chunk) > 1:
+            try:
+                parsed = _summarize_chunk_with_openai(chunk, target_keyword, queue_key=queue_key)
+            except Exception as e:
+                for article_id, text in chunk.items():
+                    results[article_id] = (f"요약 오류: {e}", "", "감성 추출 실패", "", "", text)
+                continue
+        for article_id, text in chunk.items():
+            fields = parsed.get(article_id)
+            if fields is None or fields[0] == "요약 추출 실패":
+                results[article_id] = summarize_and_sentiment_with_openai(
+                    text, target_keyword=target_keyword, llm_cache=llm_cache, queue_key=queue_key
+                )
+            else:
+                llm_cache.put(text, SUMMARY_BATCH_PROMPT_VERSION, SUMMARY_MODEL, target_keyword, fields)
+                results[article_id] = (*fields, text)
+    return results
+
+class Telegram:
+    def __init__(self):
+        self.bot = telepot.Bot(TELEGRAM_TOKEN)  # 이미 환경변수 기반
+        self.chat_id = TELEGRAM_CHAT_ID
+    def send_message(self, message):
+        self.bot.sendMessage(self.chat_id, message, parse_mode="Markdown", disable_web_page_preview=True)
+        
+def fetch_naver_news(query, start_date=None, end_date=None, limit=1000, require_keyword_in_title=False):
+    results, errors, _ = get_naver_engine().search(
+        [query], start_date, end_date, limit=limit, exclude_keywords=EXCLUDE_TITLE_KEYWORDS
+    )
+    if query in errors:
+        raise errors[query]
+    return [
+        a for a in results.get(query, [])
+        if filter_by_issues(a["title"], a["description"], [query], require_keyword_in_title)
+    ]
+
+def process_keywords(keyword_list, start_date, end_date, require_keyword_in_title=False, *, state):
+    for k in keyword_list:
+        articles = fetch_naver_news(k, start_date, end_date, require_keyword_in_title=require_keyword_in_title)
+        state["search_results"][k] = articles
+        if k not in state["show_limit"]:
+            state["show_limit"][k] = 5
+
+# --- OPTIONAL: keep existing function, just ensure fallback args are passed ---
+def summarize_article_from_url(article_url, title, do_summary=True, target_keyword=None, description=None, cache=None,
+                               session_id=None):
+    """
+    cache: 세션 상태 매핑 (Streamlit에서는 st.session_state) — 기사별 잠금에만 사용
+    session_id: OpenAI 공정 큐의 세션 키. 작업 스레드에서 호출할 때는 스크립트 스레드에서 읽어 넘길 것
+    (작업 스레드의 st.session_state에는 이 세션 값이 없음), 생략하면 cache의 값 사용
+    결과는 프로세스 단위 SummaryStore에 정규화 URL(기사 id) 단위로 보관 → 여러 기업/검색어/세션에 걸린
+    같은 기사는 본문 추출과 OpenAI 요약을 한 번만 수행, 세션 메모리는 기사 수와 무관하게 일정
+    do_summary=False면 이미 저장된 요약만 재사용하고, 없으면 본문만 채운 빈 요약 반환 (저장하지 않음)
+    """
+    store = get_summary_store()
+    cached = store.summary(article_url)
+    if cached:
+        return cached
+
+    with article_registry(cache).lock_for(article_url):
+        cached = store.summary(article_url)
+        if cached:
+            return cached
+        extracted = False
+        try:
+            full_text, extracted = _load_article_text(article_url, title, description)
+            if full_text.startswith("본문 추출 오류"):
+                result = (full_text, "", "감성 추출 실패", "", "", full_text)
+            else:
+                one_line, summary, sentiment, implication, short_implication, text = summarize_and_sentiment_with_openai(
+                    full_text, do_summary=do_summary, target_keyword=target_keyword,
+                    queue_key=openai_queue_key(session_id or session_id_of(cache), target_keyword)
+                )
+                result = (one_line, summary, sentiment, implication, short_implication, text)
+        except Exception as e:
+            result = (f"요약 오류: {e}", "", "감성 추출 실패", "", "", "")
+
+        # 제목/설명으로 대신 요약한 결과와 요약 생략 결과는 저장하지 않음 (다음 요청에서 다시 시도)
+        if extracted and do_summary:
+            store.set_summary(article_url, result)
+    return result
+
+def session_id_of(state):
+    """세션 상태의 session_id (Streamlit은 스크립트 스레드에서만 올바른 값을 읽을 수 있음)"""
+    return (state or {}).get("session_id")
+
+def openai_queue_key(session_id, company=None):
+    """OpenAIDispatcher 공정 큐 키: (세션, 기업) — 세션/기업 사이를 번갈아 가며 요청을 보냄"""
+    return (session_id, company or "")
+
+def cached_summary(article_url, state):
+    """이미 요약된 기사면 (한줄요약, 요약, 감성, 시사점, 한줄시사점, 본문) 튜플, 아니면 None (state는 호환용)"""
+    return get_summary_store().summary(article_url) if article_url else None
+
+def _load_article_text(url, title=None, description=None):
+    """
+    (본문, 실제 추출 여부) — SummaryStore에 없으면 추출해 저장
+    추출에 실패하면 제목/설명 대체 텍스트를 돌려주되 저장하지 않음 (공유 저장소에 실패가 남지 않도록)
+    """
+    store = get_summary_store()
+    text = store.full_text(url)
+    if text is not None:
+        return text, True
+    text = extract_article_body(url)
+    if text:
+        store.set_full_text(url, text)
+        return text, True
+    return fallback_article_text(description, title), False
+
+def _load_article_texts(articles):
+    """[{"link", "title", "description"}] → [(본문, 실제 추출 여부)] (DownloadScheduler로 동시에 추출)"""
+    return get_download_scheduler().map(
+        lambda article: _load_article_text(article["link"], article.get("title"), article.get("description")),
+        articles, url_of=lambda article: article["link"]
+    )
+
+def summarize_articles_from_urls(articles, batch_size=SUMMARY_BATCH_SIZE, state=None, session_id=None):
+    """
+    여러 기사를 묶음 요청으로 요약해 SummaryStore에 채운다 (이후 summarize_article_from_url은 저장된 결과를 반환)
+    articles: [{"link", "title", "keyword", "description"}] — keyword(대상 기업)가 같은 기사끼리 묶음
+    session_id: OpenAI 공정 큐의 세션 키 (생략하면 state의 값)
+    반환: {link: (한줄요약, 요약, 감성, 시사점, 한줄시사점, 본문)}
+    """
+    session_id = session_id or session_id_of(state)
+    store = get_summary_store()
+    results = {}
+    todo = {}
+    for article in articles:
+        link = article.get("link")
+        if not link or link in results or link in todo:
+            continue
+        cached = store.summary(link)
+        if cached:
+            results[link] = cached
+        else:
+            todo[link] = article
+    todo = list(todo.values())
+
+    by_keyword = {}
+    for article, (text, extracted) in zip(todo, _load_article_texts(todo)):
+        link = article["link"]
+        if text.startswith("본문 추출 오류"):
+            results[link] = (text, "", "감성 추출 실패", "", "", text)
+            continue
+        by_keyword.setdefault(article.get("keyword"), {})[article_key(link)] = (link, text, extracted)
+
+    for keyword, entries in by_keyword.items():
+        summaries = summarize_texts_with_openai(
+            {article_id: text for article_id, (_, text, _) in entries.items()},
+            target_keyword=keyword, batch_size=batch_size, queue_key=openai_queue_key(session_id, keyword)
+        )
+        for article_id, (link, _, extracted) in entries.items():
+            results[link] = summaries[article_id]
+            if extracted:
+                store.set_summary(link, results[link])
+    return results
+
+def submit_summary_batch(articles, llm_cache=None):
+    """
+    오프라인 모드: 기사 본문을 추출해 기사별 요약 요청을 OpenAI Batch API 작업 하나로 제출
+    (온라인 단건 요약과 같은 요청, 결과는 collect_summary_batches()로 받아 LLM 캐시에 저장)
+    articles: [{"link", "title", "keyword", "description"}], 이미 캐시에 있는 기사는 제외
+    반환: 작업 id (제출할 기사가 없으면 None)
+    """
+    llm_cache = llm_cache or get_llm_cache()
+    lines = []
+    requests_by_id = {}
+    for article, (text, _) in zip(articles, _load_article_texts(articles)):
+        keyword = article.get("keyword")
+        if not text or "본문 추출 오류" in text:
+            continue
+        if llm_cache.get(text, SUMMARY_CACHE_VERSIONS, SUMMARY_MODEL, keyword):
+            continue
+        hashed = text_hash(text)
+        custom_id = hashlib.sha1(f"{hashed}\x1f{keyword or ''}".encode("utf-8")).hexdigest()[:24]
+        if custom_id in requests_by_id:
+            continue
+        requests_by_id[custom_id] = {"text_hash": hashed, "target_keyword": keyword or ""}
+        lines.append(json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": summary_request(text, keyword),
+        }, ensure_ascii=False))
+    if not lines:
+        return None
+
+    client = get_openai_client()
+    batch_file = client.files.create(file=("summaries.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=batch_file.id, endpoint="/v1/chat/completions", completion_window="24h"
+    )
+    llm_cache.add_batch_job(batch.id, SUMMARY_PROMPT_VERSION, SUMMARY_MODEL, requests_by_id)
+    return batch.id
+
+def collect_summary_batches(llm_cache=None):
+    """
+    제출한 오프라인 작업 중 끝난 작업의 결과를 LLM 캐시에 저장
+    반환: {"pending": 아직 진행 중인 작업 수, "finished": 끝난 작업 수, "stored": 저장한 기사 결과 수}
+    """
+    llm_cache = llm_cache or get_llm_cache()
+    client = get_openai_client()
+    report = {"pending": 0, "finished": 0, "stored": 0}
+    for job in llm_cache.pending_batch_jobs():
+        batch = client.batches.retrieve(job["batch_id"])
+        if batch.status in ("validating", "in_progress", "finalizing", "cancelling"):
+            report["pending"] += 1
+            continue
+        # completed 외에 expired/cancelled도 끝난 요청의 결과는 output 파일에 있음
+        if batch.output_file_id:
+            for line in client.files.content(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                request = job["requests"].get(row.get("custom_id"))
+                response = row.get("response") or {}
+                if not request or response.get("status_code") != 200:
+                    continue
+                answer = response["body"]["choices"][0]["message"]["content"].strip()
+                fields = parse_summary_answer(answer)
+                if fields[0] == "요약 추출 실패":
+                    continue
+                llm_cache.put_hashed(
+                    request["text_hash"], job["prompt_version"], job["model"], request["target_keyword"], fields
+                )
+                report["stored"] += 1
+        llm_cache.finish_batch_job(job["batch_id"], batch.status)
+        report["finished"] += 1
+    return report
+
+def article_text(article):
+    return article.get("title", "") + " " + article.get("description", "") + " " + article.get("full_text", "")
+
+def or_keyword_filter(article, *keyword_lists):
+    keywords = tuple(kw for keyword_list in keyword_lists for kw in keyword_list)
+    return compile_keywords(keywords).contains_any(article_text(article))
+
+@lru_cache(maxsize=100000)
+def filter_keyword_hits(text):
+    """FILTER_MATCHER 스캔 결과 {카테고리: [키워드, ...]} (같은 텍스트는 rerun 간 재스캔하지 않음, 반환값 수정 금지)"""
+    return FILTER_MATCHER.hits(text)
+
+EXCLUDE_MATCHER = compile_keywords(tuple(EXCLUDE_TITLE_KEYWORDS))
+COMMON_MATCHER = compile_keywords(tuple(ALL_COMMON_FILTER_KEYWORDS))
+
+def article_contains_exact_keyword(article, keywords, state=None):
+    title = article.get("title", "")
+    # 이미 추출한 본문이 있으면 함께 검사 (SummaryStore 기사 id 조회, 세션 키 스캔 없음)
+    link = article.get("link", "")
+    content = get_summary_store().full_text(link) if link else ""
+    matcher = compile_keywords(tuple(keywords))
+    return matcher.contains_any(title) or bool(content and matcher.contains_any(content))
+
+def article_passes_all_filters(article, state):
+    # 제목에 제외 키워드가 포함되면 제외
+    if EXCLUDE_MATCHER.contains_any(article.get("title", "")):
+        return False
+
+    # 날짜 범위 필터링
+    try:
+        pub_date = datetime.strptime(article['date'], '%Y-%m-%d').date()
+        if pub_date < state.get("start_date") or pub_date > state.get("end_date"):
+            return False
+    except:
+        return False
+
+    # 키워드 필터: 입력 키워드 및 카테고리 키워드 집합 준비
+    all_keywords = []
+    if "keyword_input" in state:
+        all_keywords.extend([k.strip() for k in state["keyword_input"].split(",") if k.strip()])
+    if "cat_multi" in state:
+        for cat in state["cat_multi"]:
+            all_keywords.extend(favorite_categories.get(cat, []))
+
+    # 키워드 필터(입력 및 카테고리 키워드) 통과 여부
+    keyword_passed = article_contains_exact_keyword(article, all_keywords, state)
+
+    # 언론사 도메인 필터링 (특정 언론사만 필터링)
+    if state.get("filter_allowed_sources_only", True):
+        source = article.get('source', '').lower()
+        if source.startswith("www."):
+            source = source[4:]
+        if source not in ALLOWED_SOURCES:
+            return False
+
+    # 공통 필터 조건 (AND 조건, 즉 반드시 통과해야 함)
+    text = article_text(article)
+    common_passed = COMMON_MATCHER.contains_any(text)
+    if not common_passed:
+        return False
+
+    # 산업별 필터 조건 (OR 조건)
+    industry_passed = True
+    if state.get("use_industry_filter", False):
+        keyword = article.get("키워드")  # 회사명 또는 키워드 항목명
+        matched_major = None
+        for cat, companies in favorite_categories.items():
+            if keyword in companies:
+                majors = get_industry_majors_from_favorites([cat])
+                if majors:
+                    matched_major = majors[0]
+                    break
+        if matched_major:
+            sub_keyword_filter = state.get("industry_major_sub_map", {}).get(matched_major, [])
+            if sub_keyword_filter:
+                industry_passed = compile_keywords(tuple(sub_keyword_filter)).contains_any(text)
+
+    # 최종 필터링: 공통 필터는 반드시 통과하고,
+    # 산업별 필터나 키워드 필터 중 하나라도 통과하면 통과
+    if not (industry_passed or keyword_passed):
+        return False
+
+    return True
+
+# --- 중복 기사 제거 함수 ---
+def is_similar(title1, title2, threshold=0.5):
+    ratio = difflib.SequenceMatcher(None, title1, title2).ratio()
+    return ratio >= threshold
+
+def remove_duplicates(articles, index=None):
+    """
+    제목 유사도(is_similar 기준 0.5) 중복 기사 제거 — 먼저 나온 기사를 남긴다.
+    NearDuplicateIndex로 후보만 비교하며, index를 넘기면 이전에 등록한 제목과도 중복을 판정한다.
+    """
+    clusters = cluster_duplicates(articles, index)
+    return [article for article, (_, is_new) in zip(articles, clusters) if is_new]
+
+_excel_count_memo = OrderedDict()  # (제목/설명 해시, 중복 제거 여부) → 기사 수 (리스트 자체는 들고 있지 않음)
+_excel_count_lock = threading.Lock()
+
+def excel_article_count(articles, remove_duplicate_articles=False, max_entries=2000):
+    """
+    엑셀 양식의 기업별 기사 수: 공통 필터(제목+설명) 통과 후 중복 제거 옵션 적용
+    같은 제목/설명 목록은 다시 계산하지 않는다 (rerun/다운로드 버튼마다 반복 호출됨, 세션 간 공유라 잠금으로 보호)
+    """
+    key = (
+        text_hash("\n".join(f"{a.get('title', '')}\t{a.get('description', '')}" for a in articles)),
+        bool(remove_duplicate_articles),
+    )
+    with _excel_count_lock:
+        count = _excel_count_memo.get(key)
+        if count is not None:
+            _excel_count_memo.move_to_end(key)
+            return count
+
+    filtered_articles = []
+    for article in articles:
+        passes_common = COMMON_MATCHER.contains_any(article.get("title", "") + article.get("description", ""))
+        passes_industry = True
+        # 필요 시 산업별 필터링 로직 추가 가능
+
+        if passes_common and passes_industry:
+            filtered_articles.append(article)
+
+    if remove_duplicate_articles:
+        filtered_articles = remove_duplicates(filtered_articles)
+
+    with _excel_count_lock:
+        _excel_count_memo[key] = len(filtered_articles)
+        _excel_count_memo.move_to_end(key)
+        while len(_excel_count_memo) > max_entries:
+            _excel_count_memo.popitem(last=False)
+    return len(filtered_articles)
+
+def safe_title(val):
+    if pd.isnull(val) or str(val).strip() == "" or str(val).lower() == "nan" or str(val) == "0":
+        return "제목없음"
+    return str(val)
+
+def clean_excel_formula_text(text):
+    """엑셀 수식(HYPERLINK)에서 깨짐 방지용 전처리"""
+    if not isinstance(text, str):  # None이나 숫자이면 문자 변환
+        text = str(text)
+    text = text.replace('"', "'")   # 큰따옴표 → 홑따옴표
+    text = text.replace('\n', ' ')  # 줄바꿈 → 공백
+    text = text.replace('\r', '')
+    return text[:250]  # 안전하게 255자 미만으로 제한
+
+def get_excel_download_with_favorite_and_excel_company_col(summary_data, favorite_categories, excel_company_categories, search_results,
+                                                           remove_duplicate_articles=False):
+    import pandas as pd
+    from io import BytesIO
+
+    def clean_text(text):
+        if not isinstance(text, str):
+            text = str(text)
+        text = text.replace('"', "'").replace('\n', ' ').replace('\r', '')
+        return text[:200]
+
+    # 회사 리스트 (중복 제거하며 순서 유지)
+    sector_list = []
+    for cat in favorite_categories:
+        sector_list.extend(favorite_categories[cat])
+    sector_list = list(dict.fromkeys(sector_list))
+
+    # 각 회사에 대응하는 엑셀 표기명 리스트
+    excel_sector_list = []
+    for cat in excel_company_categories:
+        excel_sector_list.extend(excel_company_categories[cat])
+    excel_sector_list = list(dict.fromkeys(excel_sector_list))
+
+    # 빈 DataFrame일 경우 대비
+    if summary_data is None or len(summary_data) == 0:
+        df_empty = pd.DataFrame(columns=["기업명", "표기명", "건수", "중요뉴스1", "중요뉴스2", "시사점"])
+        output = BytesIO()
+        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+            df_empty.to_excel(writer, index=False, sheet_name='뉴스요약')
+            worksheet = writer.sheets['뉴스요약']
+            worksheet.set_column(0, 5, 30)
+        output.seek(0)
+        return output
+
+    df = pd.DataFrame(summary_data)
+
+    # ‘한줄시사점’ 우선, 없으면 ‘시사점’, ‘implication’ 컬럼으로 설정
+    if "한줄시사점" in df.columns:
+        implication_col = "한줄시사점"
+    elif "시사점" in df.columns:
+        implication_col = "시사점"
+    elif "implication" in df.columns:
+        implication_col = "implication"
+    else:
+        implication_col = None
+
+    # 키워드 관련 컬럼명 결정
+    if "키워드" in df.columns:
+        keyword_col = "키워드"
+    elif "기업명" in df.columns:
+        keyword_col = "기업명"
+    elif "회사명" in df.columns:
+        keyword_col = "회사명"
+    else:
+        keyword_col = df.columns[0] if len(df.columns) > 0 else "기업명"
+
+    rows = []
+    for idx, company in enumerate(sector_list):
+        # 해당 회사 관련 모든 기사 리스트 추출
+        search_articles = search_results.get(company, [])
+
+        # 공통 필터 통과 + 중복 제거 후 기사 수
+        total_count = excel_article_count(search_articles, remove_duplicate_articles)
+
+        # 해당 회사의 요약 데이터(중복 제거, 필터링된) 중 최신 2개 기사 추출
+        filtered_df = df[df.get(keyword_col, "") == company].sort_values(by='날짜', ascending=False)
+        hl_news = ["", ""]
+        implications = ["", ""]
+        for i, art in enumerate(filtered_df.itertuples()):
+            if i > 1:
+                break
+            date_val = getattr(art, "날짜", "") or ""
+            title_val = getattr(art, "기사제목", "") or getattr(art, "제목", "")
+            link_val = getattr(art, "링크", "") or getattr(art, "link", "")
+            display_text = f"({clean_text(date_val)}){clean_text(title_val)}"
+            if title_val and link_val:
+                hl_news[i] = f'=HYPERLINK("{clean_text(link_val)}", "{display_text}")'
+            else:
+                hl_news[i] = display_text or ""
+
+            if implication_col:
+                implications[i] = getattr(art, implication_col, "") or ""
+            else:
+                implications[i] = ""
+
+        # ‘한줄 시사점’을 번호 매겨 줄바꿈으로 병합 (최대 2개)
+        merged_implication = ""
+        if implications[0]:
+            merged_implication += f"1. {implications[0]}"
+        if implications[1]:
+            if merged_implication:
+                merged_implication += f"\n2. {implications[1]}"
+            else:
+                merged_implication = f"2. {implications[1]}"
+
+        rows.append({
+            "기업명": company,
+            "표기명": excel_sector_list[idx] if idx < len(excel_sector_list) else "",
+            "건수": total_count,
+            "중요뉴스1": hl_news[0],
+            "중요뉴스2": hl_news[1],
+            "시사점": merged_implication
+        })
+
+    result_df = pd.DataFrame(rows, columns=["기업명", "표기명", "건수", "중요뉴스1", "중요뉴스2", "시사점"])
+
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        result_df.to_excel(writer, index=False, sheet_name='뉴스요약')
+        worksheet = writer.sheets['뉴스요약']
+        for i, col in enumerate(result_df.columns):
+            worksheet.set_column(i, i, 30)
+    output.seek(0)
+    return output
+
+def get_excel_with_joined_implications(summary_data, favorite_categories, excel_company_categories, search_results,
+                                       remove_duplicate_articles=False):
+    """중요 기사 최종 엑셀 (시사점 + 한줄시사점 병합)"""
+
+    if not summary_data or len(summary_data) == 0:
+        df_empty = pd.DataFrame(columns=["기업명", "표기명", "건수", "중요뉴스1", "중요뉴스2", "시사점"])
+        output = BytesIO()
+        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+            df_empty.to_excel(writer, index=False, sheet_name='뉴스요약')
+            worksheet = writer.sheets['뉴스요약']
+            worksheet.set_column(0, 5, 30)
+        output.seek(0)
+        return output
+
+    df = pd.DataFrame(summary_data)
+
+    # 회사 리스트 (중복 제거 및 순서 유지)
+    sector_list = []
+    for cat in favorite_categories:
+        sector_list.extend(favorite_categories[cat])
+    sector_list = list(dict.fromkeys(sector_list))
+
+    excel_sector_list = []
+    for cat in excel_company_categories:
+        excel_sector_list.extend(excel_company_categories[cat])
+    excel_sector_list = list(dict.fromkeys(excel_sector_list))
+
+    rows = []
+    for idx, company in enumerate(sector_list):
+        search_articles = search_results.get(company, [])
+
+        total_count = excel_article_count(search_articles, remove_duplicate_articles)
+
+        filtered_df = df[df.get("키워드", "") == company].sort_values(by='날짜', ascending=False)
+
+        hl_news = ["", ""]
+        implications = ["", ""]
+        short_imps = ["", ""]
+
+        for i, art in enumerate(filtered_df.itertuples()):
+            if i > 1:
+                break
+            date_val = getattr(art, "날짜", "") or ""
+            title_val = getattr(art, "기사제목", "") or getattr(art, "제목", "")
+            link_val = getattr(art, "링크", "") or getattr(art, "link", "")
+            short_imp_val = getattr(art, "한줄시사점", "") or ""
+
+            display_text = f"({clean_excel_formula_text(date_val)}){clean_excel_formula_text(title_val)}"
+            if title_val and link_val:
+                hl_news[i] = f'=HYPERLINK("{clean_excel_formula_text(link_val)}", "{display_text}")'
+            else:
+                hl_news[i] = display_text or ""
+
+            implications[i] = getattr(art, "시사점", "") or ""
+            short_imps[i] = short_imp_val
+
+        # 시사점 및 한줄시사점 번호 붙여서 병합
+        merged_implications = ""
+        for n in range(2):
+            if implications[n]:
+                merged_implications += f"{n+1}. {implications[n]}\n"
+        for n in range(2):
+            if short_imps[n]:
+                merged_implications += f"{n+1}. {short_imps[n]}\n"
+
+        rows.append({
+            "기업명": company,
+            "표기명": excel_sector_list[idx] if idx < len(excel_sector_list) else "",
+            "건수": total_count,
+            "중요뉴스1": hl_news[0],
+            "중요뉴스2": hl_news[1],
+            "시사점": merged_implications.strip(),
+        })
+
+    result_df = pd.DataFrame(rows, columns=["기업명", "표기명", "건수", "중요뉴스1", "중요뉴스2", "시사점"])
+
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        result_df.to_excel(writer, index=False, sheet_name='뉴스요약')
+        worksheet = writer.sheets['뉴스요약']
+        for i, col in enumerate(result_df.columns):
+            worksheet.set_column(i, i, 30)
+    output.seek(0)
+    return output
+
+PRESCORE_TOP_K = int(os.environ.get("PRESCORE_TOP_K", 8))  # 기업별로 LLM 평가에 보낼 사전 점수 상위 기사 수
+
+@lru_cache(maxsize=64)
+def credit_impact_scorer(category, common_keywords=(), industry_keywords=()):
+    """
+    카테고리별 사전 점수기 (같은 어휘 조합은 한 번만 컴파일)
+    공통 필터 대분류 + 호출 측 공통 키워드 + 카테고리 산업 대분류 필터 키워드 + 선택한 산업 키워드
+    """
+    industry_vocab = list(industry_keywords)
+    for major in get_industry_majors_from_favorites([category]):
+        industry_vocab.extend(industry_filter_categories.get(major, []))
+    return CreditImpactScorer.from_vocabularies(
+        {**common_filter_categories, "": list(common_keywords)}, industry_vocab
+    )
+
+IMPORTANT_SELECT_CONCURRENCY = int(os.environ.get("IMPORTANT_SELECT_CONCURRENCY", 6))  # 동시에 평가할 기업 수
+IMPORTANT_SELECT_TIMEOUT = float(os.environ.get("IMPORTANT_SELECT_TIMEOUT", 60))       # 기업 1곳 평가 대기 상한(초)
+
+def _select_important_for_company(category, comp, target_articles, timeout=None, session_id=None):
+    """기업 1곳 후보 기사를 LLM으로 1~5점 평가 → 5점 기사 중 최대 2건 (시간 초과 시 FuturesTimeoutError)"""
+    # 기사 목록을 "번호. 제목 - 링크" 형태로 구성
+    prompt_list = "\n".join(
+        [f"{i+1}. {a['title']} - {a['link']}" for i, a in enumerate(target_articles)]
+    )
+
+    # --- 프롬프트: 5점 기사만 자동 선정 ---
+    guideline = f"""
+당신은 신용평가사 애널리스트입니다.
+
+[신용영향도 판단 기준]
+5점: 신용등급/전망 변화 가능성, 대규모 자본확충·차입, 유동성 위기, 부도·법정관리·회생 신청, 중대한 규제·제재·소송 등
+4점: 대규모 투자·M&A·지분매각, 실적 급변(큰 폭의 흑자/적자 변화), 레버리지 급증, 계열사의 신용위험이 본사에 중대한 영향을 줄 가능성
+3점: 일반적인 실적 개선/악화, 중간 규모의 자금조달, 사업 포트폴리오 조정(비핵심자산 매각 등)
+2점: 신제품 출시, 마케팅/프로모션, 제휴·MOU, 일반적인 사업 계획 등 신용도에 미치는 영향이 제한적인 뉴스
+1점: 사회공헌/행사/ESG 홍보, 단순 이미지 제고, 연예·문화·스포츠 등 신용과 거의 무관한 내용
+
+[기사 목록]
+{prompt_list}
+
+분석의 초점은 반드시 "{comp}" 기업(또는 키워드)이며,
+"{category}" 산업의 신용평가 관점에서 각 뉴스가 신용도에 미치는 영향도를 위 기준으로 평가하십시오.
+
+[지시사항]
+1. 각 기사 번호별로 신용영향도 점수(1~5점)를 한 번씩만 매기십시오.
+2. 반드시 **5점인 기사만** '중요 기사 후보'로 간주하십시오.
+3. 5점인 기사 중에서 가장 중요한 기사 최대 2건의 "번호"만 선택하십시오.
+   - 5점 기사 2건 이상이면 그 중에서 상위 2건만 선택하십시오.
+   - 5점 기사 1건이면 그 1건만 선택하십시오.
+   - 5점 기사 0건이면 어떤 기사도 선택하지 마십시오.
+4. 선택된 번호가 없을 수도 있습니다. 이 경우에도 아래 [선정] 형식은 유지하되 '없음'이라고 적으십시오.
+
+출력 형식은 반드시 아래 형식만 사용하십시오. 설명 문장은 넣지 마십시오.
+
+[평가]
+1번: (점수)
+2번: (점수)
+...
+
+[선정]
+[중요1]: (기사번호 또는 없음)
+[중요2]: (기사번호 또는 없음)
+"""
+
+    response = get_openai_dispatcher().create(
+        queue_key=openai_queue_key(session_id, comp),
+        wait_timeout=timeout,
+        model="gpt-3.5-turbo",
+        messages=[{"role": "user", "content": guideline}],
+        max_tokens=600,
+        temperature=0,
+    )
+    answer = response.choices[0].message.content.strip()
+
+    # --- [평가]에서 각 기사 점수 파싱 ---
+    score_map = {}
+    for line in answer.splitlines():
+        m = re.match(r"(\d+)번\s*:\s*([0-9]+)", line.strip())
+        if m:
+            no = int(m.group(1))
+            score = int(m.group(2))
+            score_map[no] = score
+
+    # --- 선택된 기사 번호 파싱 ---
+    sel1_match = re.search(r"\[중요 ?1\]\s*:\s*(\d+)", answer)
+    sel2_match = re.search(r"\[중요 ?2\]\s*:\s*(\d+)", answer)
+
+    raw_selected = []
+    if sel1_match:
+        raw_selected.append(int(sel1_match.group(1)))
+    if sel2_match:
+        raw_selected.append(int(sel2_match.group(1)))
+
+    selected_indexes = []
+    for no in raw_selected:
+        idx0 = no - 1
+        # ✅ 실제 점수가 5점인 것만 유지 (5점이 없으면 빈 목록)
+        if score_map.get(no) == 5 and 0 <= idx0 < len(target_articles):
+            if idx0 not in selected_indexes:
+                selected_indexes.append(idx0)
+
+    return [{**target_articles[idx0], "키워드": comp} for idx0 in selected_indexes]
+
+def generate_important_article_list(search_results, common_keywords, industry_keywords, favorites,
+                                    top_k=PRESCORE_TOP_K, max_workers=IMPORTANT_SELECT_CONCURRENCY,
+                                    timeout=IMPORTANT_SELECT_TIMEOUT, on_progress=None, warn=logger.warning,
+                                    session_id=None):
+    """
+    OpenAI를 이용해 '신용평가 관점에서 중요한 기사'를 자동 선정.
+    - 로컬 사전 점수(credit_impact_scorer)로 기업별 상위 top_k건만 추려 LLM에 보냄
+      (승진/MOU/사회공헌처럼 명백히 1~2점인 기사는 여기서 제외, 양수 점수 기사가 없으면 0점 기사로 대신 평가,
+       감점 기사만 남은 기업은 호출하지 않음)
+    - 각 기사에 대해 신용영향도(1~5점)를 평가하게 하고
+    - 반드시 5점 기사만 자동 선정 대상으로 사용.
+    - 결과는 기사 번호 기반으로 파싱하여 원본 기사(dict)를 반환.
+    - 기업별 평가는 최대 max_workers개 동시 호출, 기업당 timeout초(대기열 포함)를 넘기면 그 기업만 건너뜀
+    - on_progress(기업, 선정 기사, 완료 수, 전체 수): 기업 결과가 나올 때마다 호출 스레드에서 호출 (부분 결과 표시용)
+    - session_id: OpenAI 공정 큐의 세션 키 (호출 측 스크립트 스레드에서 읽어 넘김)
+    """
+    result = []
+
+    # 섹터별 키워드 파싱 (get_industry_credit_keywords() 기반)
+    def parse_industry_keywords():
+        raw_text = get_industry_credit_keywords()
+        industry_dict = {}
+        for line in raw_text.strip().split("\n"):
+            if ":" in line:
+                sector, keywords = line.split(":", 1)
+                industry_dict[sector.strip()] = [
+                    kw.strip() for kw in keywords.split(",") if kw.strip()
+                ]
+        return industry_dict
+
+    industry_keywords_dict = parse_industry_keywords()
+
+    # ---- 각 카테고리(섹터) / 회사별 후보 추리기 (로컬, 즉시) ----
+    jobs = []
+    for category, companies in favorites.items():
+        sector_keywords = industry_keywords_dict.get(category, [])
+
+        for comp in companies:
+            articles = search_results.get(comp, [])
+            if not articles:
+                continue
+
+            # 섹터 키워드가 제목/설명에 어느 정도 포함된 기사만 1차 필터
+            target_articles = []
+            for a in articles:
+                text = (a.get("title", "") + " " + a.get("description", "")).lower()
+                if sector_keywords and any(kw.lower() in text for kw in sector_keywords):
+                    target_articles.append(a)
+                elif not sector_keywords:
+                    # 섹터 키워드가 정의되지 않은 경우에는 전부 후보로 사용
+                    target_articles.append(a)
+
+            scorer = credit_impact_scorer(category, tuple(common_keywords), tuple(industry_keywords or ()))
+            target_articles = scorer.top_k(target_articles, top_k)
+            if target_articles:
+                jobs.append((category, comp, target_articles))
+
+    # ---- 기업별 LLM 평가를 동시에 (상한 max_workers, 기업별 timeout초) ----
+    selected = {}
+    if jobs:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    _select_important_for_company, category, comp, target_articles, timeout, session_id
+                ): comp
+                for category, comp, target_articles in jobs
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                comp = futures[future]
+                try:
+                    selected[comp] = future.result()
+                except FuturesTimeoutError:
+                    # 시간 초과/에러 시 이 회사에 대해서는 자동선정 건너뜀 (나머지 기업 결과는 유지)
+                    selected[comp] = []
+                    warn(f"{comp}: 중요 기사 선정 시간 초과({timeout}초)로 건너뜀")
+                except Exception as e:
+                    selected[comp] = []
+                    warn(f"{comp}: 중요 기사 선정 실패로 건너뜀 ({e})")
+                if on_progress:
+                    on_progress(comp, selected[comp], done, len(jobs))
+
+    # 완료 순서와 관계없이 즐겨찾기 순서대로 반환
+    for _, comp, _ in jobs:
+        result.extend(selected[comp])
+    return result
+
+# --- REPLACE: robust article text extractor ---
+# 기사 컨테이너 우선 탐색 (선택자는 한 번만 컴파일)
+ARTICLE_CONTAINER_SELECTORS = [
+    CSSSelector(sel) for sel in (
+        "article", ".article", ".news_body", "#articleBodyContents",
+        ".content", ".article-body", ".art_txt", ".article_view"
+    )
+]
+PARAGRAPH_SELECTOR = CSSSelector("p")
+
+PREFETCH_TOP_N = 5                       # 검색 직후 본문을 미리 받을 기업별 기사 수
+PREFETCH_BYTE_BUDGET = 20 * 1024 * 1024  # 검색 1회당 미리 가져오기 다운로드 상한
+
+ARTICLE_MAX_BYTES = int(os.environ.get("ARTICLE_MAX_BYTES", 2 * 1024 * 1024))  # 기사 페이지 1건 다운로드 상한
+
+CHARSET_HEADER_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+META_CHARSET_RE = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.I)
+XML_DECLARATION_RE = re.compile(r"^\s*<\?xml[^>]*\?>")
+# EUC-KR로 선언했지만 확장 한글(CP949)을 쓰는 페이지가 많아 상위 집합으로 디코딩
+CHARSET_ALIASES = {"euc-kr": "cp949", "euc_kr": "cp949", "ks_c_5601-1987": "cp949", "ksc5601": "cp949"}
+# 헤더/메타에 적혀 있어도 한글 페이지에서는 잘못된 값인 경우가 대부분이라 무시 (무엇이든 '성공'해 글자가 깨짐)
+UNRELIABLE_CHARSETS = {"iso-8859-1", "latin-1", "latin1", "us-ascii", "ascii"}
+
+def _decode_charset(body, charset):
+    try:
+        return body.decode(charset)
+    except UnicodeDecodeError as e:
+        # 크기 상한으로 끊긴 마지막 멀티바이트 문자는 버리고 디코딩
+        if e.start < len(body) - 4:
+            raise
+        return body[:e.start].decode(charset)
+
+def decode_html(body, content_type=""):
+    """
+    응답 바이트 → 문자열
+    Content-Type 헤더 charset → <meta charset> → UTF-8 → CP949 순서로 오류 없이 디코딩되는 첫 인코딩 사용
+    """
+    candidates = []
+    match = CHARSET_HEADER_RE.search(content_type or "")
+    if match:
+        candidates.append(match.group(1))
+    match = META_CHARSET_RE.search(body[:8192])
+    if match:
+        candidates.append(match.group(1).decode("ascii", "ignore"))
+    candidates += ["utf-8", "cp949"]
+
+    for charset in candidates:
+        charset = CHARSET_ALIASES.get(charset.lower(), charset.lower())
+        if charset in UNRELIABLE_CHARSETS:
+            continue
+        try:
+            text = _decode_charset(body, charset)
+            break
+        except (LookupError, UnicodeDecodeError):
+            continue
+    else:
+        text = body.decode("utf-8", errors="replace")
+    # lxml은 인코딩 선언이 있는 유니코드 문자열을 거부하므로 XML 선언 제거
+    return XML_DECLARATION_RE.sub("", text, count=1)
+
+def download_article_html(url, timeout=12, max_bytes=ARTICLE_MAX_BYTES):
+    """
+    기사 페이지를 한 번만 받아 newspaper/문단 추출이 함께 사용
+    - DownloadScheduler를 거쳐 언론사별 keep-alive 연결과 동시 요청 상한을 따른다
+    - 스트리밍으로 받으며 max_bytes에서 중단 (<article> 요소는 관련기사 카드/티저인 경우가 많아 중단 기준으로 쓰지 않음)
+    - 헤더/메타 태그 charset으로 디코딩 (EUC-KR 페이지 포함)
+    """
+    body, content_type = get_download_scheduler().fetch(url, max_bytes=max_bytes, timeout=timeout)
+    return decode_html(body, content_type)
+
+def extract_paragraph_text(html):
+    """기사 컨테이너(없으면 문서 전체)의 <p> 중 30자 이상 문단을 이어 붙인 텍스트 (lxml)"""
+    doc = lxml.html.fromstring(html)
+    blocks = [block for selector in ARTICLE_CONTAINER_SELECTORS for block in selector(doc)]
+    if blocks:
+        paragraphs = [p for block in blocks for p in PARAGRAPH_SELECTOR(block)]
+    else:
+        paragraphs = PARAGRAPH_SELECTOR(doc)
+
+    texts = ("".join(s.strip() for s in p.itertext()) for p in paragraphs)
+    text = " ".join(t for t in texts if len(t) >= 30)
+    return " ".join(text.split())
+
+def extract_article_text(url, fallback_desc=None, fallback_title=None, text_cache=None):
+    """
+    디스크 본문 캐시(ArticleTextCache)에 있으면 다운로드/파싱 없이 반환.
+    없으면 페이지는 한 번만 다운로드 → newspaper로 시도 → 부족하면 같은 HTML에서 lxml <p> 기반 수동 추출 →
+    그래도 실패하면 title/description을 최소 텍스트로 반환하여 요약이 동작하도록 보장.
+    실제 본문을 얻은 경우(newspaper/paragraphs)만 캐시에 저장 (일시적 실패는 다음에 다시 시도)
+    """
+    return extract_article_body(url, text_cache) or fallback_article_text(fallback_desc, fallback_title)
+
+def extract_article_body(url, text_cache=None):
+    """실제 기사 본문(디스크 캐시 또는 새로 추출)만 반환, 실패 시 None (제목/설명 대체 없음)"""
+    text_cache = text_cache or get_text_cache()
+    cached = text_cache.get(url)
+    if cached:
+        return cached["text"]
+
+    text, strategy = _extract_article_text(url)
+    if text:
+        text_cache.put(url, text, strategy)
+        return text
+    return None
+
+def fallback_article_text(fallback_desc=None, fallback_title=None):
+    """본문 추출 실패 시 최소 보장 텍스트 (설명/제목 기반)"""
+    if fallback_desc or fallback_title:
+        return f"{(fallback_title or '').strip()} {(fallback_desc or '').strip()}".strip()
+    return "본문 추출 오류"
+
+def _extract_article_text(url):
+    """반환: (본문, 추출 방식) — 추출 실패 시 (None, None)"""
+    try:
+        html = download_article_html(url)
+    except Exception:
+        return None, None
+    return extract_text_from_html(url, html)
+
+def extract_text_from_html(url, html):
+    """받아 둔 HTML에서 본문 추출 → (본문, 추출 방식), 실패 시 (None, None)"""
+    if not html:
+        return None, None
+
+    # 1) newspaper 1차 시도 (다운로드 없이 받은 HTML만 파싱)
+    try:
+        import newspaper
+        art = newspaper.Article(url, language="ko")
+        art.download(input_html=html)
+        art.parse()
+        txt = (art.text or "").strip()
+        if len(txt) >= 300:
+            return txt, "newspaper"
+    except Exception:
+        pass
+
+    # 2) 같은 HTML로 <p> 기반 fallback
+    try:
+        text = extract_paragraph_text(html)
+        if len(text) >= 200:
+            return text, "paragraphs"
+    except Exception:
+        pass
+
+    return None, None
+
+def prefetch_article_text(url):
+    """미리 가져오기용: 본문 캐시에 없을 때만 다운로드/추출해 저장하고 받은 바이트 수 반환 (캐시에 있으면 0)"""
+    text_cache = get_text_cache()
+    if text_cache.get(url):
+        return 0
+    html = download_article_html(url)
+    text, strategy = extract_text_from_html(url, html)
+    if text:
+        text_cache.put(url, text, strategy)
+    return len(html.encode("utf-8"))
+
+def prefetch_candidates(results, top_n=PREFETCH_TOP_N):
+    """
+    기업별 상위 top_n개 기사 링크 (필터 키워드 히트 수 많은 순 → 최신순), 여러 기업에 걸린 링크는 한 번만
+    results: filter_search_results() 결과 (화면에 보이는 기사 기준)
+    """
+    def score(article):
+        hits = filter_keyword_hits(article_text(article))
+        return sum(len(found) for category, found in hits.items() if category != "exclude"), article.get("date", "")
+
+    links = []
+    for articles in results.values():
+        ranked = sorted(articles, key=score, reverse=True)
+        links.extend(article["link"] for article in ranked[:top_n] if article.get("link"))
+    return list(dict.fromkeys(links))
+
+def cancel_article_prefetch(state):
+    job = state.get("prefetch_job")
+    if job is not None:
+        job.cancel()
+        state["prefetch_job"] = None
+
+def start_article_prefetch(state, top_n=PREFETCH_TOP_N, byte_budget=PREFETCH_BYTE_BUDGET):
+    """
+    검색 결과 반영 직후 호출: 이전 미리 가져오기를 취소하고, 옵션이 켜져 있으면
+    기업별 상위 기사 본문을 백그라운드에서 받아 디스크 본문 캐시에 채운다.
+    """
+    cancel_article_prefetch(state)
+    if not state.get("prefetch_articles") or not state.get("search_results"):
+        return None
+    links = prefetch_candidates(filter_search_results(state["search_results"], state), top_n)
+    if not links:
+        return None
+    job = PrefetchJob(links, prefetch_article_text, byte_budget=byte_budget, registry=article_registry(state))
+    state["prefetch_job"] = job.start()
+    return job
+    
+def extract_keyword_from_link(search_results, article_link):
+    """
+    뉴스검색결과 dict와 기사 링크로 해당 기사의 키워드(회사명/카테고리)를 추출
+    """
+    for kw, arts in search_results.items():
+        for art in arts:
+            if art.get("link") == article_link:
+                return kw
+    return ""
+
+def matched_filter_keywords(article, common_keywords, industry_keywords):
+    """
+    기사 제목/요약/본문에서 실제로 포함된 필터 키워드 리스트 반환
+    """
+    text_candidates = [
+        article.get("title", ""),
+        article.get("description", ""),
+        article.get("요약본", ""),
+        article.get("요약", ""),
+        article.get("full_text", ""),
+        article.get("content", ""),
+    ]
+    text_long = " ".join([str(t) for t in text_candidates if t])
+    return list(compile_keywords(tuple(common_keywords) + tuple(industry_keywords)).found_keywords(text_long))
+
+FRAME_COLUMNS = ("company", "article", "article_id", "title", "text", "date", "source", "키워드")
+
+def company_frame_columns(company, articles):
+    """한 기업 기사 리스트 → search_results_frame 열별 파이썬 리스트"""
+    return {
+        "company": [company] * len(articles),
+        "article": list(articles),
+        "article_id": [a.get("link", "") for a in articles],
+        "title": [a.get("title", "") for a in articles],
+        "text": [article_text(a) for a in articles],
+        "date": [a.get("date") for a in articles],
+        "source": [a.get("source") or "" for a in articles],
+        "키워드": [a.get("키워드") for a in articles],
+    }
+
+def frame_from_columns(column_parts):
+    columns = {name: [] for name in FRAME_COLUMNS}
+    for part in column_parts:
+        for name in FRAME_COLUMNS:
+            columns[name].extend(part[name])
+    # 키워드 매처는 파이썬 문자열을 그대로 받으므로 object dtype 유지 (Arrow 문자열 변환 비용 회피)
+    df = pd.DataFrame({name: pd.Series(values, dtype=object) for name, values in columns.items() if name != "date"})
+    df["pub_date"] = pd.to_datetime(pd.Series(columns["date"], dtype=object), format="%Y-%m-%d", errors="coerce")
+    df["source_domain"] = df["source"].str.lower().str.replace(r"^www\.", "", regex=True)
+    return df
+
+def search_results_frame(search_results):
+    """기업별 검색 결과 dict → 기사 1건당 1행 DataFrame (필터에 필요한 열 + 원본 기사 dict)"""
+    return frame_from_columns(
+        company_frame_columns(company, articles) for company, articles in search_results.items()
+    )
+
+def cached_search_frame(search_results, state):
+    """
+    search_results_frame()을 state["search_frame"]에 보관해 rerun마다 다시 만들지 않는다.
+    기업별 기사 리스트 객체가 그대로면 그 기업의 열 데이터를 재사용하고, 새로 검색된 기업만 다시 만든다.
+    """
+    lists = list(search_results.items())
+    cached = state.get("search_frame") or ([], None, {})
+    if cached[1] is not None and len(cached[0]) == len(lists) and all(
+        c1 == c2 and l1 is l2 for (c1, l1), (c2, l2) in zip(cached[0], lists)
+    ):
+        return cached[1]
+
+    parts = {}
+    for company, articles in lists:
+        part = cached[2].get(company)
+        if part is None or part[0] is not articles:
+            part = (articles, company_frame_columns(company, articles))
+        parts[company] = part
+    df = frame_from_columns(columns for _, columns in parts.values())
+    state["search_frame"] = (lists, df, parts)
+    return df
+
+def keyword_mask(values, matcher, where=None):
+    """문자열 열에 matcher.contains_any를 적용한 numpy 불리언 배열 (where가 있으면 그 행만 검사, 나머지는 False)"""
+    if where is None:
+        return np.fromiter(map(matcher.contains_any, values), dtype=bool, count=len(values))
+    result = np.zeros(len(values), dtype=bool)
+    rows = np.flatnonzero(where)
+    result[rows] = np.fromiter(map(matcher.contains_any, values[rows]), dtype=bool, count=len(rows))
+    return result
+
+def period_source_mask(df, state):
+    """날짜 범위/언론사 조건만의 불리언 마스크 (열 연산이라 설정이 바뀔 때마다 새로 계산해도 빠름)"""
+    # 날짜 범위 (형식이 잘못된 날짜는 제외)
+    dates = df["pub_date"]
+    start, end = pd.Timestamp(state.get("start_date")), pd.Timestamp(state.get("end_date"))
+    mask = (dates.notna() & (dates >= start) & (dates <= end)).to_numpy()
+
+    # 언론사 도메인
+    if state.get("filter_allowed_sources_only", True):
+        mask = mask & df["source_domain"].isin(ALLOWED_SOURCES).to_numpy()
+    return mask
+
+def filter_mask(df, state, return_pending=False):
+    """
+    article_passes_all_filters와 같은 조건을 search_results_frame() 전체에 한 번에 적용한 불리언 마스크(numpy)
+    날짜/언론사는 열 연산(period_source_mask), 키워드 조건은 content_filter_mask로 통과한 행에만 적용
+    return_pending=True면 (마스크, 본문이 아직 없어 키워드 조건만으로 탈락한 행 마스크) 반환
+    """
+    if df.empty:
+        empty = np.zeros(0, dtype=bool)
+        return (empty, empty) if return_pending else empty
+
+    base = period_source_mask(df, state)
+    passed, pending = content_filter_mask(df, state, where=base)
+    if return_pending:
+        return passed, pending
+    return passed
+
+def content_filter_mask(df, state, where=None):
+    """
+    제외/공통/키워드/산업별 조건(기사 내용으로 정해지는 조건)만의 마스크 → (통과, 본문 대기)
+    키워드가 제목에 없으면 이미 추출한 본문(SummaryStore)도 검사 (article_contains_exact_keyword와 동일)
+    where가 있으면 그 행만 평가 (나머지는 통과/대기 모두 False)
+    """
+    # 제목 제외 키워드
+    titles = df["title"].to_numpy()
+    texts = df["text"].to_numpy()
+    mask = ~keyword_mask(titles, EXCLUDE_MATCHER, where=where)
+    if where is not None:
+        mask &= where
+
+    # 공통 필터 (반드시 통과)
+    mask &= keyword_mask(texts, COMMON_MATCHER, where=mask)
+
+    # 키워드 필터 (입력 키워드 + 카테고리 기업명이 제목에 포함)
+    all_keywords = []
+    if "keyword_input" in state:
+        all_keywords.extend([k.strip() for k in state["keyword_input"].split(",") if k.strip()])
+    for cat in state.get("cat_multi", []):
+        all_keywords.extend(favorite_categories.get(cat, []))
+    keyword_matcher = compile_keywords(tuple(all_keywords))
+    keyword_passed = keyword_mask(titles, keyword_matcher, where=mask)
+
+    # 산업별 필터 (기사 "키워드" 항목의 기업이 속한 대분류의 선택 소분류 중 하나 포함)
+    industry_passed = np.ones(len(df), dtype=bool)
+    if state.get("use_industry_filter", False):
+        sub_map = state.get("industry_major_sub_map", {})
+        company_major = {}
+        for cat, companies in favorite_categories.items():
+            majors = get_industry_majors_from_favorites([cat])
+            for company in companies:
+                if majors and company not in company_major:
+                    company_major[company] = majors[0]
+        article_major = df["키워드"].map(company_major).to_numpy()
+        for major in {m for m in article_major if isinstance(m, str)}:
+            sub_keyword_filter = sub_map.get(major, [])
+            if sub_keyword_filter:
+                rows = (article_major == major) & mask
+                industry_passed[rows] = keyword_mask(texts[rows], compile_keywords(tuple(sub_keyword_filter)))
+
+    # 제목으로 결정되지 않은 행만 이미 추출한 본문으로 키워드 재검사 (산업별 필터도 통과하지 못한 행)
+    body_pending = np.zeros(len(df), dtype=bool)
+    if keyword_matcher.keywords:
+        store = get_summary_store()
+        ids = df["article_id"].to_numpy()
+        for row in np.flatnonzero(mask & ~keyword_passed & ~industry_passed):
+            content = store.full_text(ids[row]) if ids[row] else None
+            if content:
+                keyword_passed[row] = keyword_matcher.contains_any(content)
+            else:
+                body_pending[row] = True
+
+    return mask & (industry_passed | keyword_passed), body_pending
+
+def filter_config_key(state):
+    """content_filter_mask 결과에 영향을 주는 설정(산업별 소분류/키워드 입력/카테고리)의 해시 (기간/언론사 제외)"""
+    config = (
+        bool(state.get("use_industry_filter", False)),
+        sorted((major, tuple(subs)) for major, subs in state.get("industry_major_sub_map", {}).items()),
+        state.get("keyword_input") if "keyword_input" in state else None,
+        tuple(state.get("cat_multi", [])),
+    )
+    return hashlib.sha1(repr(config).encode("utf-8")).hexdigest()
+
+def cached_filter_mask(df, state):
+    """
+    기사 id(링크)별 content_filter_mask 통과 여부를 state["filter_verdicts"]에 설정 해시와 함께 보관
+    기간/언론사는 매번 period_source_mask로 다시 거르고, 그 안에서 아직 평가하지 않은 기사만 평가
+    → 기간/언론사만 바뀌면 키워드 매칭 없이 다시 마스킹, 키워드 관련 설정이 바뀌면 전체를 다시 평가
+    본문이 없어 키워드 조건에서 탈락한 기사는 None으로 보관 → 나중에 본문이 추출되면 다시 평가
+    """
+    config = filter_config_key(state)
+    memo = state.get("filter_verdicts")
+    if not memo or memo["config"] != config:
+        memo = state["filter_verdicts"] = {"config": config, "verdicts": {}}
+    verdicts = memo["verdicts"]
+    if df.empty:
+        return np.zeros(0, dtype=bool)
+
+    store = get_summary_store()
+    ids = df["article_id"].to_numpy()
+    base = period_source_mask(df, state)
+    unknown = np.fromiter(
+        (ok and (i not in verdicts or (verdicts[i] is None and store.full_text(i) is not None))
+         for i, ok in zip(ids, base)),
+        dtype=bool, count=len(ids)
+    )
+    if unknown.any():
+        passed, pending = content_filter_mask(df[unknown], state)
+        verdicts.update(
+            (i, None if is_pending else bool(ok)) for i, ok, is_pending in zip(ids[unknown], passed, pending)
+        )
+    return base & np.fromiter((bool(verdicts.get(i)) for i in ids), dtype=bool, count=len(ids))
+
+def body_pending_ids(state):
+    """cached_filter_mask에서 본문을 기다리는 기사 id (본문이 추출되면 필터 결과가 바뀔 수 있음)"""
+    memo = state.get("filter_verdicts") or {}
+    return tuple(i for i, verdict in memo.get("verdicts", {}).items() if verdict is None)
+
+def cached_duplicate_clusters(search_results, df, state):
+    """
+    cached_search_frame() 행별 유사 중복 클러스터 번호 (기업마다 다른 번호 구간)
+    기업별 기사 리스트 전체(필터 적용 전)를 묶어 state["dedupe_clusters"]에 리스트 객체와 함께 보관
+    → 필터 설정이 바뀌어도 다시 묶지 않고, 새로 검색된 기업만 다시 묶는다.
+    """
+    cached = state.get("dedupe_clusters") or (None, None, {})
+    if cached[0] is df:
+        return cached[1]
+
+    parts = {}
+    labels = []
+    offset = 0
+    for company, articles in search_results.items():
+        part = cached[2].get(company)
+        if part is None or part[0] is not articles:
+            clusters = cluster_duplicates(articles)
+            part = (articles, np.fromiter((cid for cid, _ in clusters), dtype=np.int64, count=len(clusters)))
+        parts[company] = part
+        labels.append(part[1] + offset)
+        offset += len(articles)
+    labels = np.concatenate(labels) if labels else np.zeros(0, dtype=np.int64)
+    state["dedupe_clusters"] = (df, labels, parts)
+    return labels
+
+def filter_search_results(search_results, state):
+    """
+    검색 결과에 전체 필터와 중복 제거 옵션을 적용 (기사가 남은 기업만 반환)
+    검색 결과와 필터 설정이 그대로면 이전 결과를 그대로 반환 (체크박스 클릭 등 rerun에서 재계산 없음)
+    중복 제거: 필터를 통과한 기사 중 유사 중복 클러스터(cached_duplicate_clusters)별로 먼저 나온 기사만 남김
+    """
+    df = cached_search_frame(search_results, state)
+    if df.empty:
+        return {}
+
+    memo_key = (
+        filter_config_key(state),
+        str(state.get("start_date")),
+        str(state.get("end_date")),
+        bool(state.get("filter_allowed_sources_only", True)),
+        bool(state.get("remove_duplicate_articles", False)),
+    )
+    memo = state.get("filtered_results_memo")
+    store = get_summary_store()
+    if (
+        memo and memo[0] is df and memo[1] == memo_key
+        and not any(store.full_text(i) is not None for i in memo[3])
+    ):
+        return {keyword: list(articles) for keyword, articles in memo[2].items()}
+
+    passed = cached_filter_mask(df, state)
+    if state.get("remove_duplicate_articles", False):
+        rows = np.flatnonzero(passed)
+        _, first = np.unique(cached_duplicate_clusters(search_results, df, state)[rows], return_index=True)
+        passed = np.zeros(len(df), dtype=bool)
+        passed[rows[first]] = True
+
+    filtered_results = {
+        keyword: group["article"].tolist() for keyword, group in df[passed].groupby("company", sort=False)
+    }
+
+    state["filtered_results_memo"] = (df, memo_key, filtered_results, body_pending_ids(state))
+    return {keyword: list(articles) for keyword, articles in filtered_results.items()}
+
+def selected_industry_keywords(state):
+    industry_keywords_all = []
+    if state.get("use_industry_filter", False):
+        for sublist in state.get("industry_major_sub_map", {}).values():
+            industry_keywords_all.extend(sublist)
+    return industry_keywords_all
+
+def to_important_preview(art):
+    """자동 선정 결과를 중요 기사 목록 형식으로 변환 (키 명 통일, 시사점은 빈 문자열로 초기화)"""
+    return {
+        "키워드": art.get("키워드") or art.get("회사명") or art.get("keyword") or "",
+        "기사제목": art.get("기사제목") or art.get("제목") or art.get("title") or "",
+        "감성": art.get("감성", ""),
+        "링크": art.get("링크") or art.get("link", ""),
+        "날짜": art.get("날짜") or art.get("date", ""),
+        "출처": art.get("출처") or art.get("source", ""),
+        "시사점": art.get("시사점", "")
+    }
+
+def summarize_important_article(raw_article, industry_keywords_all, do_summary=True, cache=None, session_id=None):
+    """중요 기사 목록 항목 → 요약/감성/시사점이 포함된 엑셀용 dict"""
+    link = raw_article.get("링크", "")
+    keyword = raw_article.get("키워드", "")
+    one_line, summary, sentiment, implication, short_implication, full_text = summarize_article_from_url(
+        link, raw_article.get("기사제목", ""), do_summary=do_summary, target_keyword=keyword, cache=cache,
+        session_id=session_id
+    )
+    filter_hits = matched_filter_keywords(
+        {"title": raw_article.get("기사제목", ""), "요약본": summary,
+         "요약": one_line, "full_text": full_text},
+        ALL_COMMON_FILTER_KEYWORDS,
+        industry_keywords_all
+    )
+    return {
+        "키워드": keyword,
+        "필터히트": ", ".join(filter_hits),
+        "기사제목": safe_title(raw_article.get("기사제목", "")),
+        "요약": one_line,
+        "요약본": summary,
+        "감성": sentiment,
+        "시사점": implication,
+        "한줄시사점": short_implication,
+        "링크": link,
+        "날짜": raw_article.get("날짜", ""),
+        "출처": raw_article.get("출처", ""),
+        "full_text": full_text or "",
+    }
+
+def build_telegram_messages(summary_data, max_length=3500):
+    """요약된 중요 기사 목록 → 텔레그램 메시지 리스트 (메시지 길이 제한을 넘지 않도록 분할)"""
+    def escape(text):
+        return re.sub(r"([_*\[\]`])", r"\\\1", str(text or ""))
+
+    blocks = []
+    for company in dict.fromkeys(row["키워드"] for row in summary_data):
+        lines = [f"*[{escape(company)}]*"]
+        for row in summary_data:
+            if row["키워드"] != company:
+                continue
+            lines.append(f"- [{escape(row['기사제목'])}]({row['링크']}) ({row['날짜']}, {escape(row['감성'])})")
+            if row.get("한줄시사점"):
+                lines.append(f"  {escape(row['한줄시사점'])}")
+        blocks.append("\n".join(lines))
+
+    messages, current = [], ""
+    for block in blocks:
+        if current and len(current) + len(block) + 2 > max_length:
+            messages.append(current)
+            current = ""
+        current = f"{current}\n\n{block}" if current else block
+    if current:
+        messages.append(current)
+    return messages
@@ -0,0 +1,234 @@
+import asyncio
+import concurrent.futures
+import os
+import random
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from token_budget import count_tokens
+
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("OPENAI_MAX_CONCURRENCY", 8))
+DEFAULT_RPM = int(os.environ.get("OPENAI_RPM", 500))        # 계정 분당 요청 한도
+DEFAULT_TPM = int(os.environ.get("OPENAI_TPM", 200000))     # 계정 분당 토큰 한도
+
+
+def estimate_request_tokens(request):
+    """
+    요청이 차지할 토큰 추정치 (로컬 토큰 계산 + 응답 상한 max_tokens — OpenAI도 max_tokens로 한도를 계산)
+    실제 사용량은 응답의 usage로 정산한다.
+    """
+    prompt = sum(count_tokens(message.get("content") or "") for message in request.get("messages", []))
+    return prompt + int(request.get("max_tokens") or 0)
+
+
+def _session_of(queue_key):
+    """queue_key (세션, 기업)의 세션 부분 (튜플이 아닌 키는 키 전체를 세션으로 취급)"""
+    return queue_key[0] if isinstance(queue_key, tuple) and queue_key else queue_key
+
+
+class _Bucket:
+    """분당 한도를 초당 비율로 채우는 token bucket (음수 허용: 추정보다 많이 쓴 만큼 다음 요청이 기다림)"""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+
+class OpenAIDispatcher:
+    """
+    프로세스 공유 OpenAI 호출 디스패처
+    - 전용 이벤트 루프 스레드 하나에서 AsyncOpenAI로 호출 → 어느 스레드/세션에서 호출해도 같은 한도를 공유
+    - 동시 요청 max_concurrency개, 분당 요청(rpm)/분당 토큰(tpm) 예산 안에서만 요청을 보냄
+      (토큰은 요청 전 추정치로 예약하고 응답의 usage로 정산)
+    - 공정 큐: 요청마다 queue_key(세션, 기업)를 붙이고 세션을 먼저 돌아가며, 세션 안에서는 기업별 대기열을 돌아가며 꺼냄
+      → 기업을 많이 고른 세션도 다른 사용자와 같은 몫만 차지하고, 한 기업의 대량 요청이 같은 세션의 다른 기업을 밀어내지 않음
+    - 429/5xx/네트워크 오류는 지수 백오프(429는 Retry-After 동안 전체 발송 중지) 후 재시도
+    """
+
+    RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+    def __init__(self, api_key=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM,
+                 max_retries=4, client_factory=None):
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self._requests = _Bucket(rpm)
+        self._tokens = _Bucket(tpm)
+        self._client_factory = client_factory
+        self._client = None
+        self._loop = None
+        self._lock = threading.Lock()
+        self._queues = {}        # queue_key → deque[(request, future, tokens)]
+        self._sessions = {}      # 세션 → 대기 중인 queue_key 라운드로빈 순서 (deque)
+        self._order = deque()    # 대기 중인 세션 라운드로빈 순서
+        self._paused_until = 0.0
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "tokens": 0}
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    self._work = asyncio.Event()
+                    self._slots = asyncio.Semaphore(self.max_concurrency)
+                    loop.create_task(self._pump())
+                    started.set()
+                    loop.run_forever()
+
+                threading.Thread(target=run, name="openai-dispatcher", daemon=True).start()
+                started.wait()
+                self._loop = loop
+            return self._loop
+
+    def _get_client(self):
+        if self._client is None:
+            if self._client_factory:
+                self._client = self._client_factory()
+            else:
+                from openai import AsyncOpenAI
+                # 재시도는 디스패처가 한도와 함께 관리
+                self._client = AsyncOpenAI(api_key=self.api_key, max_retries=0)
+        return self._client
+
+    def create(self, queue_key=None, wait_timeout=None, **request):
+        """
+        chat.completions.create와 같은 인자로 호출, 응답 객체 반환 (호출 스레드는 결과가 나올 때까지 대기)
+        wait_timeout: 대기열 대기 + 호출 전체 상한(초). 넘기면 요청을 취소하고 concurrent.futures.TimeoutError
+        """
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._submit(queue_key, request), loop)
+        try:
+            return future.result(wait_timeout)
+        except concurrent.futures.TimeoutError:
+            # 아직 대기열에 있으면 _pump가 건너뛰고, 진행 중이면 응답을 버림
+            future.cancel()
+            raise
+
+    async def _submit(self, queue_key, request):
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(queue_key)
+        if queue is None:
+            queue = self._queues[queue_key] = deque()
+            session = _session_of(queue_key)
+            keys = self._sessions.get(session)
+            if keys is None:
+                keys = self._sessions[session] = deque()
+                self._order.append(session)
+            keys.append(queue_key)
+        queue.append((request, future, estimate_request_tokens(request)))
+        self._work.set()
+        return await future
+
+    async def _next(self):
+        while not self._order:
+            self._work.clear()
+            await self._work.wait()
+        session = self._order.popleft()
+        keys = self._sessions[session]
+        queue_key = keys.popleft()
+        queue = self._queues[queue_key]
+        item = queue.popleft()
+        if queue:
+            keys.append(queue_key)
+        else:
+            del self._queues[queue_key]
+        if keys:
+            self._order.append(session)
+        else:
+            del self._sessions[session]
+        return item
+
+    async def _reserve(self, tokens):
+        """요청 1건과 추정 토큰을 예산에서 예약 (모자라면 채워질 때까지 대기)"""
+        tokens = min(tokens, self._tokens.capacity)
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            wait = max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+            if wait <= 0:
+                self._requests.tokens -= 1
+                self._tokens.tokens -= tokens
+                return tokens
+            await asyncio.sleep(wait)
+
+    async def _pump(self):
+        while True:
+            await self._slots.acquire()
+            request, future, tokens = await self._next()
+            if future.cancelled():
+                self._slots.release()
+                continue
+            reserved = await self._reserve(tokens)
+            asyncio.get_running_loop().create_task(self._run(request, future, reserved))
+
+    def _retry_delay(self, attempt, error):
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                retry_after = None
+        base = retry_after if retry_after is not None else min(2 ** attempt, 30)
+        return base + random.uniform(0, 0.5)
+
+    async def _run(self, request, future, reserved):
+        try:
+            for attempt in range(self.max_retries + 1):
+                self.stats["requests"] += 1
+                try:
+                    response = await self._get_client().chat.completions.create(**request)
+                except Exception as e:
+                    status = getattr(e, "status_code", None)
+                    retryable = status in self.RETRY_STATUS or (
+                        status is None and type(e).__name__ in ("APIConnectionError", "APITimeoutError")
+                    )
+                    if not retryable or attempt == self.max_retries:
+                        raise
+                    self.stats["retries"] += 1
+                    delay = self._retry_delay(attempt, e)
+                    if status == 429:
+                        # 계정 한도에 걸렸으면 다른 요청도 같이 쉬어야 연속 429가 나지 않음
+                        self.stats["throttled"] += 1
+                        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                    await asyncio.sleep(delay)
+                    reserved = await self._reserve(reserved)
+                    continue
+
+                # 추정 토큰과 실제 사용량 차이를 정산
+                usage = getattr(response, "usage", None)
+                used = getattr(usage, "total_tokens", None)
+                if used is not None:
+                    self._tokens.tokens += reserved - used
+                    self.stats["tokens"] += used
+                if not future.cancelled():
+                    future.set_result(response)
+                return
+        except Exception as e:
+            if not future.cancelled():
+                future.set_exception(e)
+        finally:
+            self._slots.release()
+
+
+@lru_cache(maxsize=None)
+def get_openai_dispatcher():
+    return OpenAIDispatcher(api_key=os.environ.get("OPENAI_API_KEY"))
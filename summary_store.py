@@ -0,0 +1,103 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from article_registry import article_key
+
+DEFAULT_MAX_BYTES = int(os.environ.get("SUMMARY_STORE_MAX_BYTES", 64 * 1024 * 1024))
+# 실패 결과의 한줄요약 접두어 — 이런 결과는 저장하지 않아 다음 요청에서 다시 시도
+FAILED_SUMMARY_PREFIXES = ("요약 오류", "OpenAI API 키가", "본문 추출 오류", "기사 본문이 추출 실패", "요약 추출 실패")
+
+
+def is_failed_summary(result):
+    """요약 결과 튜플이 오류/추출 실패 결과인지"""
+    return not result or str(result[0]).startswith(FAILED_SUMMARY_PREFIXES)
+
+
+def _text_size(value):
+    # 한글 기사 기준 UTF-8 길이로 근사 (정확한 객체 크기보다 예산 계산이 싸고 안정적)
+    return len(value.encode("utf-8")) if isinstance(value, str) else 0
+
+
+class SummaryStore:
+    """
+    기사 id(article_key) → 본문/요약 LRU 저장소 (프로세스 단위, 세션 상태 밖)
+    - 조회/저장은 기사 id 딕셔너리 O(1), 세션 키를 훑지 않음
+    - 요약 5개 필드와 본문을 한 항목으로 보관하고, 항목 크기 합계가 max_bytes를 넘으면
+      가장 오래 쓰지 않은 기사부터 제거 (제거된 기사는 다시 요청하면 새로 추출/요약)
+    - 세션마다 따로 들고 있지 않으므로 여러 사용자가 같은 기사를 열어도 메모리는 한 벌
+    - 모든 세션이 공유하므로 성공한 요약과 실제 추출한 본문만 저장 (오류/대체 텍스트는 호출 측이 매번 다시 시도)
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # id → {"summary": 5-튜플 | None, "full_text": str | None, "size": int}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, url):
+        return article_key(url) in self._entries
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def _get(self, url):
+        key = article_key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, url, **fields):
+        key = article_key(url)
+        with self._lock:
+            entry = self._entries.pop(key, None) or {"summary": None, "full_text": None, "size": 0}
+            self._bytes -= entry["size"]
+            entry.update(fields)
+            entry["size"] = _text_size(entry["full_text"]) + sum(map(_text_size, entry["summary"] or ()))
+            self._entries[key] = entry
+            self._bytes += entry["size"]
+            # 방금 넣은 항목은 예산보다 커도 남긴다 (바로 다음 조회에서 쓰이므로)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted["size"]
+
+    def summary(self, url):
+        """(한줄요약, 요약, 감성, 시사점, 한줄시사점, 본문) 튜플 또는 None"""
+        entry = self._get(url)
+        if entry is None or entry["summary"] is None:
+            return None
+        return entry["summary"] + (entry["full_text"] or "",)
+
+    def set_summary(self, url, result):
+        """성공한 요약만 저장, 저장했으면 True (오류 결과는 버려 다른 세션이 다시 요청할 수 있게)"""
+        if is_failed_summary(result):
+            return False
+        *fields, text = result
+        self._put(url, summary=tuple(fields), full_text=text)
+        return True
+
+    def full_text(self, url):
+        entry = self._get(url)
+        return entry["full_text"] if entry else None
+
+    def set_full_text(self, url, text):
+        """실제 추출한 본문만 넘길 것 (제목/설명 대체 텍스트는 저장하지 않음)"""
+        self._put(url, full_text=text)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+@lru_cache(maxsize=None)
+def get_summary_store():
+    """프로세스 단위로 하나만 생성 (Streamlit rerun/세션 간 공유)"""
+    return SummaryStore()
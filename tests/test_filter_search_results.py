@@ -0,0 +1,76 @@
+import random
+import time
+from datetime import date, timedelta
+
+import pytest
+
+import news_pipeline as npl
+
+
+def _search_results(companies, per_company, seed=0):
+    rng = random.Random(seed)
+    words = ["".join(chr(rng.randint(0xAC00, 0xD7A3)) for _ in range(rng.randint(2, 3))) for _ in range(3000)]
+    sources = sorted(npl.ALLOWED_SOURCES)[:5] + ["blog.example.com"]
+    results = {}
+    for company in companies:
+        articles = []
+        for i in range(per_company):
+            title = f"{company} " + " ".join(rng.choice(words) for _ in range(rng.randint(4, 8)))
+            if articles and rng.random() < 0.3:
+                title = rng.choice(articles)["title"] + " [종합]"
+            articles.append({
+                "title": title,
+                "description": rng.choice(npl.ALL_COMMON_FILTER_KEYWORDS) + " " + " ".join(rng.sample(words, 8)),
+                "link": f"https://news.example.com/{company}/{i}",
+                "date": (date(2026, 10, 1) + timedelta(days=rng.randint(0, 17))).strftime("%Y-%m-%d"),
+                "source": rng.choice(sources),
+                "키워드": company,
+            })
+        results[company] = articles
+    return results
+
+
+def _state(results, **overrides):
+    overrides.setdefault("start_date", date(2026, 10, 1))
+    overrides.setdefault("end_date", date(2026, 10, 18))
+    return npl.new_state(search_results=results, keyword_input=",".join(results), **overrides)
+
+
+def _links(filtered):
+    return {company: [a["link"] for a in articles] for company, articles in filtered.items()}
+
+
+COMPANIES = list(dict.fromkeys(c for companies in npl.favorite_categories.values() for c in companies))
+
+
+@pytest.mark.parametrize("change", [
+    {"end_date": date(2026, 10, 12)},
+    {"start_date": date(2026, 10, 5), "filter_allowed_sources_only": True},
+    {"remove_duplicate_articles": False},
+])
+def test_cached_results_match_fresh_state(change):
+    results = _search_results(COMPANIES[:5], 200, seed=1)
+    state = _state(results)
+    npl.filter_search_results(results, state)
+    state.update(change)
+    assert _links(npl.filter_search_results(results, state)) == _links(
+        npl.filter_search_results(results, _state(results, **change))
+    )
+
+
+def test_refilter_50k_articles_under_one_second():
+    results = _search_results(COMPANIES[:25], 2000, seed=2)
+    state = _state(results)
+    npl.filter_search_results(results, state)  # 최초 1회: 프레임/필터 판정/중복 클러스터 생성
+
+    for change in (
+        {"end_date": date(2026, 10, 15)},
+        {"start_date": date(2026, 10, 3)},
+        {"filter_allowed_sources_only": True},
+        {"remove_duplicate_articles": False},
+    ):
+        state.update(change)
+        start = time.perf_counter()
+        filtered = npl.filter_search_results(results, state)
+        assert time.perf_counter() - start < 1.0, change
+        assert filtered
@@ -0,0 +1,65 @@
+import difflib
+import random
+
+from near_duplicates import NearDuplicateIndex, cluster_duplicates
+
+
+def _random_word(rng):
+    return "".join(chr(rng.randint(0xAC00, 0xD7A3)) for _ in range(rng.randint(2, 3)))
+
+
+def _company_titles(n, seed=0, company="삼성전자"):
+    """같은 기업명으로 시작하는 제목 n개 (약 30%는 앞 제목의 단어 일부를 바꾼 변형)"""
+    rng = random.Random(seed)
+    words = [_random_word(rng) for _ in range(3000)]
+    base = [f"{company} " + " ".join(rng.choice(words) for _ in range(rng.randint(4, 8))) for _ in range(n * 7 // 10)]
+    titles = list(base)
+    while len(titles) < n:
+        w = rng.choice(base).split()
+        for _ in range(rng.randint(0, 2)):
+            w[rng.randrange(1, len(w))] = rng.choice(words)
+        if rng.random() < 0.5:
+            w.insert(rng.randrange(1, len(w)), rng.choice(["[속보]", "단독", "종합"]))
+        titles.append(" ".join(w))
+    rng.shuffle(titles)
+    return titles
+
+
+def _brute_force(titles, threshold=0.5):
+    """기존 remove_duplicates의 1:1 비교 (앞에 나온 제목을 남김)"""
+    kept, result = [], []
+    for title in titles:
+        for i, existing in enumerate(kept):
+            if difflib.SequenceMatcher(None, title, existing).ratio() >= threshold:
+                result.append((i, False))
+                break
+        else:
+            kept.append(title)
+            result.append((len(kept) - 1, True))
+    return result
+
+
+def test_matches_pairwise_comparison():
+    titles = _company_titles(300, seed=1) + ["", "", "삼성전자"]
+    index = NearDuplicateIndex()
+    assert [index.add(t) for t in titles] == _brute_force(titles)
+
+
+def test_same_company_titles_skip_most_comparisons():
+    n = 2000
+    index = NearDuplicateIndex()
+    for title in _company_titles(n, seed=2):
+        index.add(title)
+    # 전체 1:1 비교라면 대표 제목 수 × n / 2 수준 (수십만 회)
+    assert index.comparisons < 5 * n
+    assert len(index) < n
+
+
+def test_incremental_index_keeps_cluster_ids():
+    articles = [{"title": "삼성전자 3분기 영업이익 급감"}, {"title": "LG전자 신제품 출시"}]
+    index = NearDuplicateIndex()
+    first = cluster_duplicates(articles, index)
+    second = cluster_duplicates([{"title": "삼성전자 3분기 영업이익 급감 [종합]"}], index)
+    assert first == [(0, True), (1, True)]
+    assert second == [(0, False)]
+    assert index.cluster_size(0) == 2
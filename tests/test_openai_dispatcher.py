@@ -0,0 +1,39 @@
+import asyncio
+
+from openai_dispatcher import OpenAIDispatcher
+
+
+def _dispatch_order(submissions):
+    """submissions: [(queue_key, 요청 수)] 순서대로 대기열에 넣은 뒤 _next가 꺼내는 (queue_key, 번호) 순서"""
+    dispatcher = OpenAIDispatcher()
+
+    async def scenario():
+        dispatcher._work = asyncio.Event()
+        tasks = [
+            asyncio.ensure_future(dispatcher._submit(key, {"messages": [], "id": (key, i)}))
+            for key, count in submissions for i in range(count)
+        ]
+        await asyncio.sleep(0)
+        order = []
+        for _ in tasks:
+            request, future, _ = await dispatcher._next()
+            order.append(request["id"])
+            future.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return order
+
+    return asyncio.run(scenario())
+
+
+def test_sessions_take_turns_before_companies():
+    a1, a2, a3, b1 = ("a", "삼성전자"), ("a", "LG전자"), ("a", "SK하이닉스"), ("b", "현대차")
+    order = _dispatch_order([(a1, 2), (a2, 2), (a3, 2), (b1, 3)])
+    assert order == [
+        (a1, 0), (b1, 0), (a2, 0), (b1, 1), (a3, 0), (b1, 2),
+        (a1, 1), (a2, 1), (a3, 1),
+    ]
+
+
+def test_plain_keys_are_their_own_session():
+    order = _dispatch_order([(None, 2), ("batch", 1)])
+    assert order == [(None, 0), ("batch", 0), (None, 1)]
@@ -0,0 +1,20 @@
+from token_budget import TRIM_MARK, compress_body, count_tokens, trim_to_budget
+
+
+def test_boilerplate_lines_are_dropped():
+    text = "삼성전자가 3분기 실적을 발표했다.\n\n홍길동 기자 hong@example.com\nⓒ 무단전재 및 재배포 금지"
+    assert compress_body(text) == "삼성전자가 3분기 실적을 발표했다."
+
+
+def test_single_line_fallback_text_is_kept():
+    text = "삼성전자, 3분기 영업이익 급감 [사진=삼성전자] 삼성전자가 3분기 실적을 발표했다"
+    assert compress_body(text) == text
+    assert trim_to_budget(text, 2000) == text
+
+
+def test_trim_to_budget_fits_budget():
+    text = "\n".join(f"{i}번째 문단입니다. 반도체 수요 회복이 예상된다." for i in range(200))
+    trimmed = trim_to_budget(text, 100)
+    assert trimmed.endswith(TRIM_MARK)
+    assert trimmed.startswith("0번째 문단입니다.")
+    assert count_tokens(trimmed) <= 100
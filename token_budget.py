@@ -0,0 +1,144 @@
+import logging
+import math
+import re
+import threading
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+HANGUL_RE = re.compile(r"[가-힣]")
+PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n|\n")
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?。])\s+|(?<=다\.)")
+# 본문 끝에 붙는 기자 이메일/저작권 문구 등 요약에 쓸모없는 줄
+BOILERPLATE_RE = re.compile(
+    r"무단\s*전재|재배포\s*금지|저작권자|ⓒ|©|Copyright|[\w.+-]+@[\w-]+\.[\w.]+|기자\s*$|사진\s*=|\[사진",
+    re.I
+)
+TRIM_MARK = " …(이하 생략)"
+
+
+@lru_cache(maxsize=None)
+def _encoding():
+    """gpt-4o 계열 토크나이저 (tiktoken이 없으면 None → 문자 수 기반 근사)"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text):
+    """
+    로컬 토큰 수 계산 (API 호출 없음)
+    tiktoken이 있으면 정확히, 없으면 한글 1자 ≈ 1토큰, 그 외 약 3.5자 ≈ 1토큰으로 근사 (실제보다 약간 크게)
+    """
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    hangul = len(HANGUL_RE.findall(text))
+    others = len(text) - hangul - text.count(" ")
+    return hangul + math.ceil(max(others, 0) / 3.5)
+
+
+def compress_body(text):
+    """
+    공백 정리 + 기자 이메일/저작권 등 상투 문구 줄 제거 (문단 구분은 유지)
+    모든 줄이 상투 문구로 걸리면(제목+설명 한 줄 대체 본문 등) 줄 제거 없이 공백만 정리
+    """
+    paragraphs = [" ".join(p.split()) for p in PARAGRAPH_SPLIT_RE.split(text or "")]
+    paragraphs = [p for p in paragraphs if p]
+    kept = [p for p in paragraphs if not (len(p) < 120 and BOILERPLATE_RE.search(p))]
+    return "\n".join(kept or paragraphs)
+
+
+def _cut_to_tokens(text, max_tokens):
+    """text 앞부분을 max_tokens 안으로 강제로 자름 (문단/문장 하나가 예산보다 긴 경우)"""
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    # 근사 계산은 접두어 길이에 대해 단조 증가 → 이분 탐색
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+def trim_to_budget(text, max_tokens):
+    """
+    본문을 max_tokens 안으로 줄임 — 기사 앞부분(리드 문단)부터 순서대로 채우고,
+    넘치는 문단은 문장 단위로 자른 뒤 생략 표시를 붙인다.
+    넘치는 문장은 남은 예산만큼 잘라 넣음 (첫 문단/문장이 예산보다 길어도 빈 본문이 되지 않도록)
+    """
+    text = compress_body(text)
+    if count_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - count_tokens(TRIM_MARK)
+    kept = []
+    used = 0
+    for paragraph in text.split("\n"):
+        cost = count_tokens(paragraph)
+        if used + cost <= budget:
+            kept.append(paragraph)
+            used += cost
+            continue
+        # 문단(또는 구분 없이 이어 붙인 본문)이 넘치면 문장 단위로 채움
+        sentences = []
+        for sentence in SENTENCE_SPLIT_RE.split(paragraph):
+            cost = count_tokens(sentence)
+            if used + cost > budget:
+                cut = _cut_to_tokens(sentence.strip(), budget - used)
+                if cut:
+                    sentences.append(cut)
+                break
+            sentences.append(sentence)
+            used += cost
+        if sentences:
+            kept.append(" ".join(s.strip() for s in sentences))
+        break
+    return "\n".join(kept) + TRIM_MARK
+
+
+class TokenBudget:
+    """
+    요약 프롬프트 토큰 절감 집계 (프로세스 단위)
+    record(원래 프롬프트, 실제 프롬프트) → 호출별 보고 {"original_tokens", "prompt_tokens", "saved_tokens"}
+    (호출별 보고는 로그로 남기고 누적값은 snapshot()으로 조회)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "original_tokens": 0, "prompt_tokens": 0, "saved_tokens": 0}
+
+    def record(self, original_tokens, prompt_tokens):
+        report = {
+            "original_tokens": original_tokens,
+            "prompt_tokens": prompt_tokens,
+            "saved_tokens": max(original_tokens - prompt_tokens, 0),
+        }
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["original_tokens"] += original_tokens
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["saved_tokens"] += report["saved_tokens"]
+        logger.info(
+            "요약 프롬프트 토큰 %d (원래 %d → %d 절감)",
+            prompt_tokens, original_tokens, report["saved_tokens"]
+        )
+        return report
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+
+@lru_cache(maxsize=None)
+def get_token_budget():
+    return TokenBudget()